@@ -12,7 +12,7 @@ from fastapi.responses import FileResponse
 
 from src.api.routes import router as api_router
 from src.models.config import get_config
-from src.utils.logger import setup_logger, get_logger
+from src.utils.logger import setup_logger, shutdown_logger, get_logger
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,7 @@ async def lifespan(app: FastAPI):
     yield
     # 关闭时
     logger.info("CodeSummaryAgent Web服务关闭")
+    await shutdown_logger()
 
 
 def create_app() -> FastAPI:
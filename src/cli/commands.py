@@ -14,7 +14,8 @@ from src.core.analyzer import CodeAnalyzer, analyze_codebase
 from src.models.config import AppConfig, load_config, get_config
 from src.services.directory_scanner import DirectoryScanner
 from src.utils.tree_printer import print_tree
-from src.utils.logger import setup_logger
+from src.utils.logger import setup_logger, shutdown_logger
+from src.utils.event_loop import install_fast_event_loop
 
 # 创建Typer应用
 app = typer.Typer(
@@ -57,6 +58,21 @@ def analyze(
         "--concurrent", "-n",
         help="LLM最大并发数",
     ),
+    log_file: Optional[str] = typer.Option(
+        None,
+        "--log-file",
+        help="同时将日志写入该文件（按10MB轮转）",
+    ),
+    async_log: bool = typer.Option(
+        False,
+        "--async-log",
+        help="使用异步方式写日志文件，写盘不阻塞事件循环（需配合 --log-file）",
+    ),
+    compress_logs: bool = typer.Option(
+        False,
+        "--compress-logs",
+        help="将轮转下来的日志文件gzip压缩，在后台线程进行（需配合 --log-file，不支持 --async-log）",
+    ),
 ) -> None:
     """
     分析代码库，生成文档
@@ -67,7 +83,12 @@ def analyze(
         code-summary analyze ./my-project -o ./my-project-docs
     """
     # 配置日志
-    setup_logger(log_level=log_level)
+    setup_logger(
+        log_level=log_level,
+        log_file=log_file,
+        async_file=async_log,
+        compress=compress_logs,
+    )
 
     # 验证路径
     source_path = Path(source).resolve()
@@ -133,9 +154,10 @@ def analyze(
         console.print(f"[red]初始化失败: {e}[/red]")
         raise typer.Exit(1)
 
-    # 执行分析
+    # 执行分析（uvloop/winloop可用时使用高性能事件循环）
+    install_fast_event_loop()
     try:
-        success = asyncio.run(analyzer.analyze(resume=not no_resume))
+        success = asyncio.run(_run_analysis(analyzer, resume=not no_resume))
 
         if success:
             console.print()
@@ -155,6 +177,14 @@ def analyze(
         raise typer.Exit(1)
 
 
+async def _run_analysis(analyzer: CodeAnalyzer, resume: bool) -> bool:
+    """执行分析，结束前在事件循环内刷新并关闭异步日志文件"""
+    try:
+        return await analyzer.analyze(resume=resume)
+    finally:
+        await shutdown_logger()
+
+
 @app.command()
 def scan(
     source: str = typer.Argument(
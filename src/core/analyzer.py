@@ -20,7 +20,7 @@ from src.services.checkpoint import (
 from src.core.document_generator import DocumentGenerator
 from src.core.level_processor import LevelProcessor
 from src.utils.tree_printer import print_tree
-from src.utils.logger import get_logger, setup_logger
+from src.utils.logger import get_logger, setup_logger, shutdown_logger
 
 logger = get_logger(__name__)
 
@@ -156,8 +156,13 @@ class CodeAnalyzer:
             self._notify_progress("扫描目录结构...", 0)
             self._root = self._scanner.scan(str(self.source_path))
 
-            # 打印初始目录树
-            print_tree(self._root, show_status=False, title="[bold]代码库结构[/bold]")
+            # 打印初始目录树（仅供终端查看，输出被重定向时跳过）
+            print_tree(
+                self._root,
+                show_status=False,
+                title="[bold]代码库结构[/bold]",
+                terminal_only=True,
+            )
 
             # 加载断点（如果启用）
             if resume:
@@ -254,6 +259,11 @@ class CodeAnalyzer:
             self._end_time = time.time()
             raise
 
+        finally:
+            # 释放LLM客户端持有的长连接
+            if self._llm_service:
+                await self._llm_service.aclose()
+
     def _notify_progress(self, message: str, percentage: float) -> None:
         """发送进度通知"""
         logger.info(f"[{percentage:.0f}%] {message}")
@@ -324,6 +334,9 @@ class CodeAnalyzer:
             # 使用进度管理器打印最终摘要
             self._processor.progress_manager.print_final_summary(elapsed)
 
+        if self._llm_service and self._llm_service.cache:
+            self._llm_service.cache.log_stats()
+
     def get_stats(self) -> Dict[str, Any]:
         """获取分析统计"""
         stats = {
@@ -354,6 +367,9 @@ async def analyze_codebase(
     docs_path: Optional[str] = None,
     resume: bool = True,
     log_level: str = "INFO",
+    log_file: Optional[str] = None,
+    async_log: bool = False,
+    compress_logs: bool = False,
 ) -> bool:
     """
     分析代码库的便捷函数
@@ -364,12 +380,20 @@ async def analyze_codebase(
         docs_path: 文档输出目录路径
         resume: 是否启用断点续传
         log_level: 日志级别
+        log_file: 日志文件路径，None则只输出到控制台
+        async_log: 是否异步写日志文件
+        compress_logs: 是否gzip压缩轮转下来的日志文件
 
     Returns:
         是否成功完成
     """
     # 配置日志
-    setup_logger(log_level=log_level)
+    setup_logger(
+        log_level=log_level,
+        log_file=log_file,
+        async_file=async_log,
+        compress=compress_logs,
+    )
 
     # 创建分析器并执行
     analyzer = CodeAnalyzer(
@@ -378,4 +402,8 @@ async def analyze_codebase(
         docs_path=docs_path,
     )
 
-    return await analyzer.analyze(resume=resume)
+    try:
+        return await analyzer.analyze(resume=resume)
+    finally:
+        # 异步日志sink的缓冲需在事件循环结束前写盘
+        await shutdown_logger()
@@ -288,15 +288,15 @@ class DocumentGenerator:
         async with aiofiles.open(doc_path, "r", encoding="utf-8") as f:
             return await f.read()
 
-    async def read_child_summaries(self, node: FileNode) -> str:
+    async def read_child_summary_list(self, node: FileNode) -> List[str]:
         """
-        读取子节点的所有总结文档并合并
+        读取子节点的所有总结文档
 
         Args:
             node: 目录节点
 
         Returns:
-            合并后的子节点总结文本
+            每个子节点一条的总结文本列表（已带标题）
         """
         summaries = []
 
@@ -304,12 +304,24 @@ class DocumentGenerator:
             if child.doc_path:
                 try:
                     content = await self.read_document(child.doc_path)
-                    # 添加分隔符
                     summaries.append(f"### {child.name}\n\n{content}")
                 except Exception as e:
                     logger.warning(f"读取子节点文档失败: {child.doc_path}, {e}")
 
-        return "\n\n---\n\n".join(summaries)
+        return summaries
+
+    async def read_child_summaries(self, node: FileNode) -> str:
+        """
+        读取子节点的所有总结文档并合并
+
+        Args:
+            node: 目录节点
+
+        Returns:
+            合并后的子节点总结文本
+        """
+        # 添加分隔符
+        return "\n\n---\n\n".join(await self.read_child_summary_list(node))
 
     async def read_all_file_docs(self, node: FileNode) -> str:
         """
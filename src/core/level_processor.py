@@ -10,7 +10,7 @@ import time
 from src.models.file_node import FileNode, AnalysisTask, AnalysisResult, AnalysisStatus
 from src.models.config import get_config
 from src.services.directory_scanner import get_nodes_by_depth, get_max_depth
-from src.services.llm_service import LLMService, get_llm_service, API_USAGE_BATCH_THRESHOLD
+from src.services.llm_service import LLMService, DirectoryBundle, get_llm_service, API_USAGE_BATCH_THRESHOLD
 from src.services.llm_queue import LLMQueue
 from src.services.checkpoint import (
     CheckpointService,
@@ -23,6 +23,7 @@ from src.services.checkpoint import (
     generate_api_summary_table,
 )
 from src.core.document_generator import DocumentGenerator
+from src.utils.pipeline import gather_or_cancel, run_pipeline
 from src.utils.retry import RetryHandler, RetryExhaustedError
 from src.utils.progress_manager import ProgressManager
 from src.utils.logger import get_logger
@@ -268,9 +269,6 @@ class LevelProcessor:
         if not pending_files:
             return results
 
-        # 创建分析任务
-        tasks = [AnalysisTask(node=f, priority=f.depth) for f in pending_files]
-
         # 进度回调 - 更新进度管理器中的任务状态
         def on_progress(node: FileNode, status: str) -> None:
             if self._on_progress:
@@ -326,6 +324,17 @@ class LevelProcessor:
             for node in pending_files:
                 await progress_manager.start_task(node, "等待中")
 
+        # Batch API：先整体提交离线批处理，批内无结果的文件再走实时队列
+        if self.llm_service.batch_api_enabled:
+            pending_files = await self._analyze_files_via_batch(
+                pending_files, on_progress, on_complete
+            )
+            if not pending_files:
+                return results
+
+        # 创建分析任务
+        tasks = [AnalysisTask(node=f, priority=f.depth) for f in pending_files]
+
         self.llm_queue.set_callbacks(on_progress=on_progress, on_complete=on_complete)
 
         # 提交任务并处理
@@ -337,6 +346,67 @@ class LevelProcessor:
 
         return results
 
+    async def _analyze_files_via_batch(
+        self,
+        files: List[FileNode],
+        on_progress: Callable[[FileNode, str], None],
+        on_complete: Callable[[AnalysisResult], Any],
+    ) -> List[FileNode]:
+        """
+        通过Batch API批量分析文件
+
+        有结果的文件直接走完成回调（保存文档、更新断点）；批处理整体失败、
+        超时取消或单条结果缺失的文件原样返回，由调用方交给实时队列处理。
+
+        Args:
+            files: 待分析的文件节点
+            on_progress: 进度回调
+            on_complete: 完成回调
+
+        Returns:
+            仍需实时分析的文件节点
+        """
+        batch_files: List[FileNode] = []
+        contents: List[Tuple[str, str]] = []
+        remaining: List[FileNode] = []
+        for node in files:
+            try:
+                with open(node.path, "r", encoding="utf-8", errors="ignore") as f:
+                    contents.append((node.relative_path, f.read()))
+                batch_files.append(node)
+            except OSError:
+                # 读取失败交给实时队列，沿用其错误处理和重试
+                remaining.append(node)
+
+        for node in batch_files:
+            node.status = AnalysisStatus.IN_PROGRESS
+            on_progress(node, "批处理分析中...")
+
+        start_time = time.time()
+        try:
+            summaries = await self.llm_service.analyze_codes_batch(contents)
+        except Exception as e:
+            logger.warning(f"Batch API调用失败，全部回退为实时调用: {e}")
+            return files
+        elapsed = time.time() - start_time
+
+        for i, node in enumerate(batch_files):
+            summary = summaries.get(i)
+            if not summary or not summary.strip():
+                remaining.append(node)
+                continue
+            node.status = AnalysisStatus.COMPLETED
+            await on_complete(AnalysisResult(
+                node=node,
+                success=True,
+                summary=summary,
+                elapsed_time=elapsed,
+            ))
+
+        if remaining:
+            logger.warning(f"Batch任务中 {len(remaining)} 个文件无结果，回退为实时调用")
+        return remaining
+
     async def _process_directories(
         self,
         dirs: List[FileNode]
@@ -413,9 +483,13 @@ class LevelProcessor:
 
         try:
             # 读取子节点文档（不需要信号量，只是IO操作）
-            sub_docs = await self.doc_generator.read_child_summaries(node)
+            bundle = DirectoryBundle(
+                name=node.name,
+                path=node.relative_path or node.name,
+                docs=await self.doc_generator.read_child_summary_list(node),
+            )
 
-            if not sub_docs:
+            if not bundle.docs:
                 # 没有子文档（空目录或子节点都失败了）
                 logger.warning(f"目录无子文档: {node.relative_path}")
                 node.status = AnalysisStatus.SKIPPED
@@ -436,11 +510,7 @@ class LevelProcessor:
 
                 # 带验证的目录总结生成（空内容会触发重试）
                 async def summarize_with_validation() -> str:
-                    summary = await self.llm_service.summarize_directory(
-                        node.name,
-                        node.relative_path or node.name,
-                        sub_docs,
-                    )
+                    summary = await self.llm_service.summarize_directory_bundle(bundle)
                     if not summary or not summary.strip():
                         raise ValueError("LLM返回了空的目录总结内容")
                     return summary
@@ -717,35 +787,58 @@ class LevelProcessor:
             logger.error(f"生成API文档失败: {e}")
             return None
 
+    async def _load_api_file_doc(self, file_path: str) -> Optional[str]:
+        """
+        读取API文件的分析文档
+
+        Args:
+            file_path: 文件相对路径
+
+        Returns:
+            文档内容，找不到、读取失败或为空时返回None（单个文件出错不影响其他文件）
+        """
+        doc_path = self.checkpoint.get_doc_path_by_relative(file_path)
+        if not doc_path:
+            # 尝试从文件节点获取
+            for file_node in self.root.get_all_files():
+                if file_node.relative_path == file_path and file_node.doc_path:
+                    doc_path = file_node.doc_path
+                    break
+
+        if not doc_path:
+            logger.error(f"API详情提取失败 - 找不到文件文档: {file_path}")
+            logger.debug(f"  检查 _doc_path_map 和 node.doc_path 是否正确设置")
+            return None
+
+        # 读取文档内容
+        try:
+            file_doc = await self.doc_generator.read_document(doc_path)
+        except Exception as e:
+            logger.error(f"API详情提取失败 - 读取文件文档出错: {file_path} ({doc_path}), {e}")
+            return None
+        if not file_doc:
+            logger.error(f"API详情提取失败 - 文档内容为空: {file_path} ({doc_path})")
+            return None
+
+        return file_doc
+
     async def _extract_api_details_batch(self, file_paths: List[str]) -> None:
         """
         并发提取多个文件的API接口详情
 
+        配置了 max_batch_chars 时，先将多个文件打包为一次请求批量提取，
+        批量结果中缺失的文件再回退为逐个提取。
+
         Args:
             file_paths: 需要提取详情的文件路径列表
         """
-        async def extract_single(file_path: str) -> None:
+        async def extract_single(file_path: str, file_doc: Optional[str] = None) -> None:
             """提取单个文件的接口详情"""
             try:
-                # 读取文件的分析文档
-                doc_path = self.checkpoint.get_doc_path_by_relative(file_path)
-                if not doc_path:
-                    # 尝试从文件节点获取
-                    for file_node in self.root.get_all_files():
-                        if file_node.relative_path == file_path and file_node.doc_path:
-                            doc_path = file_node.doc_path
-                            break
-
-                if not doc_path:
-                    logger.error(f"API详情提取失败 - 找不到文件文档: {file_path}")
-                    logger.debug(f"  检查 _doc_path_map 和 node.doc_path 是否正确设置")
-                    return
-
-                # 读取文档内容
-                file_doc = await self.doc_generator.read_document(doc_path)
-                if not file_doc:
-                    logger.error(f"API详情提取失败 - 文档内容为空: {file_path} ({doc_path})")
-                    return
+                if file_doc is None:
+                    file_doc = await self._load_api_file_doc(file_path)
+                    if not file_doc:
+                        return
 
                 # 带验证的API详情提取（空内容会触发重试）
                 async def extract_with_validation() -> str:
@@ -769,9 +862,66 @@ class LevelProcessor:
             except Exception as e:
                 logger.error(f"API详情提取失败 - LLM调用错误: {file_path}, {e}")
 
-        # 并发执行所有提取任务
-        tasks = [extract_single(fp) for fp in file_paths]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        max_batch_chars = get_config().llm.max_batch_chars
+        if max_batch_chars <= 0:
+            # 并发执行所有提取任务
+            tasks = [extract_single(fp) for fp in file_paths]
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return
+
+        # ============ 批量模式：按字符数打包，一批一次请求 ============
+        docs = await asyncio.gather(*[self._load_api_file_doc(fp) for fp in file_paths])
+
+        batches: List[List[Tuple[str, str]]] = []
+        singles: List[Tuple[str, str]] = []
+        current: List[Tuple[str, str]] = []
+        current_chars = 0
+        for file_path, file_doc in zip(file_paths, docs):
+            if not file_doc:
+                continue
+            if len(file_doc) > max_batch_chars:
+                # 单个文档已超过批次上限，直接逐个提取
+                singles.append((file_path, file_doc))
+                continue
+            if current and current_chars + len(file_doc) > max_batch_chars:
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append((file_path, file_doc))
+            current_chars += len(file_doc)
+        if current:
+            batches.append(current)
+
+        async def extract_batch(batch: List[Tuple[str, str]]) -> None:
+            """批量提取一批文件，未返回结果的文件回退为逐个提取"""
+            if len(batch) == 1:
+                singles.extend(batch)
+                return
+
+            results: Dict[str, str] = {}
+            try:
+                async with self._semaphore:
+                    logger.debug(f"批量提取API详情: {len(batch)} 个文件")
+                    results = await self.retry_handler.execute(
+                        self.llm_service.extract_api_details_batch,
+                        batch,
+                    )
+            except Exception as e:
+                logger.warning(f"批量API详情提取失败，回退为逐个提取: {len(batch)} 个文件, {e}")
+
+            for file_path, file_doc in batch:
+                details = results.get(file_path)
+                if details:
+                    self.checkpoint.save_api_details(file_path, details)
+                    logger.info(f"已提取API详情: {file_path}")
+                else:
+                    singles.append((file_path, file_doc))
+
+        await asyncio.gather(*[extract_batch(b) for b in batches], return_exceptions=True)
+
+        if singles:
+            logger.info(f"逐个提取API详情: {len(singles)} 个文件")
+            tasks = [extract_single(fp, doc) for fp, doc in singles]
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def generate_api_usage_doc(self) -> Optional[str]:
         """
@@ -968,7 +1118,6 @@ class LevelProcessor:
         Returns:
             完整的API使用文档内容
         """
-        module_docs: Dict[str, str] = {}
         module_order = [
             "核心业务接口",
             "会话管理接口",
@@ -978,43 +1127,35 @@ class LevelProcessor:
             "辅助接口",
         ]
 
-        # 按模块生成接口详情
-        logger.info(f"分批生成: 共 {len(api_modules)} 个模块")
-
-        for module_name, module_apis in api_modules.items():
-            if not module_apis:
-                continue
+        # 按模块生成接口详情：模块列表格式化与LLM调用组成流水线，模块之间并发生成
+        modules = [(name, apis) for name, apis in api_modules.items() if apis]
+        logger.info(f"分批生成: 共 {len(modules)} 个模块")
 
+        def build_module_request(module: Tuple[str, List[str]]) -> Tuple[str, str]:
+            """格式化模块接口列表"""
+            module_name, module_apis = module
             logger.info(f"生成模块文档: {module_name} ({len(module_apis)} 个接口)")
+            return module_name, "\n".join([f"- {api}" for api in module_apis])
 
-            # 格式化模块接口列表
-            module_api_list = "\n".join([f"- {api}" for api in module_apis])
+        async def generate_module(request: Tuple[str, str]) -> str:
+            """在共享信号量下生成单个模块的文档（带重试和空内容验证）"""
+            module_name, module_api_list = request
 
-            # 使用局部变量捕获当前循环的值，避免闭包陷阱
-            current_module_name = module_name
-            current_module_api_list = module_api_list
+            async def generate_module_with_validation() -> str:
+                content = await self.llm_service.generate_api_usage_module(
+                    self.root.name,
+                    module_name,
+                    module_api_list,
+                    combined_details,
+                )
+                if not content or not content.strip():
+                    raise ValueError(f"LLM返回空的{module_name}文档内容")
+                return content
 
             async with self._semaphore:
-                async def generate_module_with_validation(
-                    _module_name: str = current_module_name,
-                    _module_api_list: str = current_module_api_list
-                ) -> str:
-                    content = await self.llm_service.generate_api_usage_module(
-                        self.root.name,
-                        _module_name,
-                        _module_api_list,
-                        combined_details,
-                    )
-                    if not content or not content.strip():
-                        raise ValueError(f"LLM返回空的{_module_name}文档内容")
-                    return content
-
-                module_doc = await self.retry_handler.execute(generate_module_with_validation)
-                module_docs[module_name] = module_doc
+                return await self.retry_handler.execute(generate_module_with_validation)
 
         # 生成通用部分
-        logger.info("生成API使用文档通用部分...")
-
         # 构建API概况
         api_overview_lines = [f"项目共有 {total_count} 个API接口，分布如下："]
         for module_name in module_order:
@@ -1025,7 +1166,9 @@ class LevelProcessor:
         # 只取部分详情用于推断认证方式等（避免上下文过长）
         details_sample = combined_details[:8000] if len(combined_details) > 8000 else combined_details
 
-        async with self._semaphore:
+        async def generate_common() -> str:
+            logger.info("生成API使用文档通用部分...")
+
             async def generate_common_with_validation() -> str:
                 content = await self.llm_service.generate_api_usage_common(
                     self.root.name,
@@ -1036,7 +1179,22 @@ class LevelProcessor:
                     raise ValueError("LLM返回空的通用部分内容")
                 return content
 
-            common_doc = await self.retry_handler.execute(generate_common_with_validation)
+            async with self._semaphore:
+                return await self.retry_handler.execute(generate_common_with_validation)
+
+        # 模块文档与通用部分互不依赖，同时进行；一方失败时取消另一方
+        module_results, common_doc = await gather_or_cancel([
+            asyncio.create_task(run_pipeline(
+                modules,
+                [build_module_request, generate_module],
+                workers=get_config().llm.max_concurrent,
+            )),
+            asyncio.create_task(generate_common()),
+        ])
+        module_docs = {
+            module_name: module_doc
+            for (module_name, _), module_doc in zip(modules, module_results)
+        }
 
         # 程序化合并所有部分
         logger.info("合并所有部分...")
@@ -51,11 +51,71 @@ class LLMConfig(BaseModel):
         le=128000,
         description="最大生成token数(可选)"
     )
+    max_input_tokens: Optional[int] = Field(
+        default=None,
+        ge=1024,
+        description="代码分析时单个文件的最大输入token数(可选)，超出时保留头尾、截断中间"
+    )
+    context_window: Optional[int] = Field(
+        default=None,
+        ge=4096,
+        description="模型上下文窗口token数(可选)，API详情提取时文档超出窗口则按语义边界分块处理"
+    )
+    max_batch_chars: int = Field(
+        default=0,
+        ge=0,
+        description="API详情批量提取时单批文档的最大字符数，0表示逐文件提取"
+    )
+    # 响应缓存配置
+    cache_enabled: bool = Field(
+        default=False,
+        description="是否启用LLM响应磁盘缓存(相同请求直接复用历史响应)"
+    )
+    cache_dir: str = Field(
+        default="~/.codesummary/llm_cache",
+        description="LLM响应缓存目录"
+    )
+    cache_ttl: Optional[int] = Field(
+        default=None,
+        ge=60,
+        description="LLM响应缓存有效期(秒，可选)，为None则永不过期"
+    )
+    # Batch API配置
+    use_batch_api: bool = Field(
+        default=False,
+        description="批量代码分析是否使用OpenAI Batch API(费用减半、不占RPM，但结果最长24小时返回)"
+    )
+    batch_poll_interval: int = Field(
+        default=30,
+        ge=5,
+        le=3600,
+        description="Batch任务状态轮询间隔(秒)"
+    )
+    batch_max_wait: int = Field(
+        default=86400,
+        ge=60,
+        description="Batch任务最长等待时间(秒)，超时取消任务，未完成的文件回退为实时调用"
+    )
     # SSL验证配置
     verify_ssl: bool = Field(
         default=True,
         description="是否验证SSL证书(中转站可能需要禁用)"
     )
+    # 连接与限流配置
+    http2: bool = Field(
+        default=False,
+        description="是否启用HTTP/2多路复用(需安装 httpx[http2])"
+    )
+    rate_limit_rpm: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="每分钟最大请求数(可选)，为None则不限流"
+    )
+    rate_limit_tpm: Optional[int] = Field(
+        default=None,
+        ge=1000,
+        description="每分钟最大输入token数(可选)，为None则不限流"
+    )
 
     @field_validator("api_key", "base_url", mode="before")
     @classmethod
@@ -0,0 +1,148 @@
+"""
+LLM响应缓存模块
+以请求参数的SHA-256为键，将完整响应持久化到磁盘，重复运行时跳过相同的LLM调用
+"""
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_CACHE_DIR = "~/.codesummary/llm_cache"
+
+_TRAILING_WHITESPACE = re.compile(r"[ \t]+(?=\n)")
+_EXTRA_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    规范化提示词中不影响语义的空白差异
+
+    统一换行符、去掉行尾空白、合并连续空行；行首缩进保留不动（代码缩进有语义）。
+
+    Args:
+        prompt: 原始提示词
+
+    Returns:
+        规范化后的提示词
+    """
+    text = prompt.replace("\r\n", "\n")
+    text = _TRAILING_WHITESPACE.sub("", text)
+    text = _EXTRA_BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+class LLMCache:
+    """
+    基于文件的LLM响应缓存
+
+    每条响应存为一个文本文件，按键的前两位分子目录，避免单目录文件过多。
+    写入先落临时文件再原子替换，并发写同一个键也不会产生半截内容。
+    键基于规范化后的提示词计算，仅空白不同的请求（如换行符、行尾空格）共用一条缓存。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+        ttl: Optional[int] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录，支持 ~ 展开
+            ttl: 缓存有效期（秒），None表示永不过期
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"LLM响应缓存已启用: {self.cache_dir}")
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        api_format: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> str:
+        """
+        计算缓存键
+
+        base_url 参与计算：同名模型在不同中转站背后可能是不同的实际模型。
+
+        Returns:
+            所有影响响应的请求参数拼接后的SHA-256十六进制摘要
+        """
+        raw = f"{base_url}|{model}|{temperature}|{max_tokens}|{api_format}|{system}|{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的响应内容，未命中返回None
+        """
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                # 过期条目直接删除，按未命中处理
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+            value = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            # 文件不存在、权限不足、读取出错等一律按未命中处理，缓存故障不影响主流程
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"LLM缓存读取失败: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"LLM缓存命中: {key[:12]}")
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 响应内容
+        """
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(value, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # 缓存写失败不影响主流程
+            logger.warning(f"LLM缓存写入失败: {e}")
+
+    def log_stats(self) -> None:
+        """输出命中统计"""
+        total = self.hits + self.misses
+        if total:
+            logger.info(
+                f"LLM缓存统计: 命中 {self.hits}/{total} ({self.hits / total:.0%}), 未命中 {self.misses}"
+            )
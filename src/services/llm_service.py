@@ -11,16 +11,20 @@ LLM服务模块 - 完全仿照 E:/code/AFN/backend/app/utils/llm_tool.py 实现
 - 其他模型 -> 使用OpenAI格式 (/v1/chat/completions)
 """
 
-import json
+import asyncio
 import os
-from dataclasses import asdict, dataclass
+import string
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from enum import Enum
-from typing import AsyncGenerator, Dict, List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
 
-import httpx
-from openai import AsyncOpenAI
+import orjson
 
 from src.models.config import LLMConfig, get_config
+from src.services.llm_cache import LLMCache
 from src.utils.api_format import (
     APIFormat,
     build_anthropic_endpoint,
@@ -28,6 +32,14 @@ from src.utils.api_format import (
     get_browser_headers,
 )
 from src.utils.logger import get_logger
+from src.utils.rate_limiter import TokenBucket
+from src.utils.retry import RetryExhaustedError, RetryHandler
+from src.utils.tokenizer import count_tokens, split_by_tokens, truncate_middle
+
+# openai / httpx 依赖树较大，延迟到真正创建客户端时才导入；
+# 使用 MockLLMService 或只引用本模块常量时不承担导入开销
+if TYPE_CHECKING:
+    import httpx
 
 logger = get_logger(__name__)
 
@@ -289,7 +301,26 @@ READING_GUIDE_PROMPT = """请根据以下项目文档，生成一份项目文档
 # 第一阶段：对每个API文件提取接口详情（中间结果）
 # 第二阶段：汇总所有中间结果生成最终API文档
 
-API_EXTRACT_PROMPT = """请从以下代码文件分析文档中**精确提取**所有API接口信息。
+# API接口提取的公共规则，单文件与批量提取共用，保证两条路径的提取口径一致
+_API_EXTRACT_AUTH_RULES = """## 认证判断规则
+
+根据以下特征判断接口是否需要认证：
+- 使用了 `@require_auth`、`@require_admin`、`@login_required` 等装饰器 → 需要认证
+- 使用了 `Depends(require_api_auth)`、`Depends(get_current_user)` 等依赖 → 需要认证
+- 路由定义中明确提到 "无需认证"、"公开接口" → 无需认证
+- 登录接口（如 `/login`）本身 → 无需认证
+- 健康检查、静态资源接口 → 通常无需认证
+- 如果文档未明确说明，标注为"未明确"
+"""
+
+_API_EXTRACT_FORBIDDEN = """## 禁止事项
+- 禁止编造文档中未提及的接口
+- 禁止生成请求/响应示例
+- 禁止遗漏认证要求信息
+"""
+
+API_EXTRACT_PROMPT = (
+    """请从以下代码文件分析文档中**精确提取**所有API接口信息。
 
 文件路径: {file_path}
 
@@ -302,16 +333,7 @@ API_EXTRACT_PROMPT = """请从以下代码文件分析文档中**精确提取**
 2. **必须标注认证要求**：每个接口必须明确标注是否需要认证
 3. **保持信息原貌**：接口路径、方法必须与文档描述完全一致
 
-## 认证判断规则
-
-根据以下特征判断接口是否需要认证：
-- 使用了 `@require_auth`、`@require_admin`、`@login_required` 等装饰器 → 需要认证
-- 使用了 `Depends(require_api_auth)`、`Depends(get_current_user)` 等依赖 → 需要认证
-- 路由定义中明确提到 "无需认证"、"公开接口" → 无需认证
-- 登录接口（如 `/login`）本身 → 无需认证
-- 健康检查、静态资源接口 → 通常无需认证
-- 如果文档未明确说明，标注为"未明确"
-
+""" + _API_EXTRACT_AUTH_RULES + """
 ## 输出格式（严格按此格式）
 
 如果文件包含API接口，按以下格式输出：
@@ -325,11 +347,8 @@ API_EXTRACT_PROMPT = """请从以下代码文件分析文档中**精确提取**
 如果文件中没有API接口，只输出一行：
 **该文件未定义API接口**
 
-## 禁止事项
-- 禁止编造文档中未提及的接口
-- 禁止生成请求/响应示例
-- 禁止遗漏认证要求信息
-"""
+""" + _API_EXTRACT_FORBIDDEN
+)
 
 # 第二阶段：汇总提示词（固定模板格式）
 API_SUMMARY_PROMPT = """请根据以下各文件提取的API接口信息，生成一份**精确、完整**的接口清单。
@@ -417,6 +436,12 @@ FINAL_DOC_MAX_TOKENS = 16384
 # 4096 tokens 对于大型文件（如api_server.py）明显不足
 CODE_ANALYSIS_MIN_TOKENS = 8192
 
+# 按上下文窗口分块时预留的token数，抵消计数误差和消息格式开销
+CONTEXT_SAFETY_TOKENS = 1024
+
+# API提取Prompt约定的"无接口"输出
+NO_API_MARKER = "该文件未定义API接口"
+
 API_DOC_PROMPT = """请根据以下项目文档，生成一份完整的API接口文档。
 
 项目名称: {project_name}
@@ -700,6 +725,43 @@ const response = await fetch('/v1/chat/completions', {{
 - 如果信息不足，标注"待补充"而非编造
 """
 
+# 批量提取API接口信息：多个文件合并为一次请求，结果以JSON返回
+API_EXTRACT_BATCH_PROMPT = (
+    """请从以下多个代码文件分析文档中**精确提取**所有API接口信息。
+
+每个文件以 <<FILE id=编号 path=文件路径>> 开始、以 <<END>> 结束，请对每个文件**独立**提取，不要混淆不同文件的接口。
+
+{files_block}
+
+## 严格要求
+
+1. **只提取明确存在的接口**：只输出文档中明确提到的接口，禁止推测或编造
+2. **必须标注认证要求**：每个接口必须明确标注是否需要认证
+3. **保持信息原貌**：接口路径、方法必须与文档描述完全一致
+4. **覆盖所有文件**：每个文件编号都必须有且只有一条结果
+
+""" + _API_EXTRACT_AUTH_RULES + """
+## 单个文件的 detail 格式
+
+如果文件包含API接口：
+
+### <文件路径> 的接口列表
+
+| 序号 | 方法 | 路径 | 功能描述 | 认证要求 |
+|------|------|------|----------|----------|
+| 1 | GET/POST/... | /api/xxx | 简要描述 | 需要/无需/未明确 |
+
+如果文件中没有API接口，detail 只包含一行：
+**该文件未定义API接口**
+
+""" + _API_EXTRACT_FORBIDDEN + """
+## 输出格式（严格按此格式）
+
+只输出一个JSON对象，不要输出任何其他内容（包括代码块标记），detail 中的换行使用 \\n 转义：
+{{"results": [{{"id": 0, "detail": "..."}}, {{"id": 1, "detail": "..."}}]}}
+"""
+)
+
 # ============ 分批生成API使用文档（解决接口过多导致截断问题） ============
 # 当接口数量超过阈值时，按模块分批生成，最后合并
 
@@ -863,6 +925,175 @@ const response = await fetch('/endpoint', {{
 """
 
 
+# ============ Prompt模板预编译 ============
+# 模块加载时一次性解析模板，调用时只做片段拼接，避免每次 str.format 重新扫描整个模板
+
+
+def _compile_prompt(template: str) -> Callable[..., str]:
+    """
+    将 str.format 风格的模板预编译为渲染函数
+
+    Args:
+        template: 使用 {name} 占位、{{ }} 转义的模板字符串
+
+    Returns:
+        渲染函数，通过关键字参数传入各占位符的值
+    """
+    segments: List[Tuple[str, Optional[str]]] = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"Prompt模板不支持格式说明符: {{{field_name}}}")
+        segments.append((literal, field_name))
+
+    def render(**kwargs: Any) -> str:
+        parts: List[str] = []
+        for literal, field_name in segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(str(kwargs[field_name]))
+        return "".join(parts)
+
+    return render
+
+
+# 代码分析Prompt以 {code_content} 为界拆成头尾两段：
+# 头部只依赖file_path，按路径缓存；尾部不含占位符，预先渲染为常量。
+# 拼接时代码内容不经过任何模板扫描，大文件尤其受益
+_CODE_ANALYSIS_HEAD_TPL, _, _CODE_ANALYSIS_TAIL_TPL = CODE_ANALYSIS_PROMPT.partition("{code_content}")
+_render_code_analysis_head = _compile_prompt(_CODE_ANALYSIS_HEAD_TPL)
+_CODE_ANALYSIS_TAIL = _compile_prompt(_CODE_ANALYSIS_TAIL_TPL)()
+
+
+@lru_cache(maxsize=4096)
+def _code_analysis_head(file_path: str) -> str:
+    """渲染代码分析Prompt的头部（按文件路径缓存）"""
+    return _render_code_analysis_head(file_path=file_path)
+
+
+_render_directory_summary = _compile_prompt(DIRECTORY_SUMMARY_PROMPT)
+_render_readme = _compile_prompt(README_PROMPT)
+_render_reading_guide = _compile_prompt(READING_GUIDE_PROMPT)
+_render_api_extract = _compile_prompt(API_EXTRACT_PROMPT)
+_render_api_extract_batch = _compile_prompt(API_EXTRACT_BATCH_PROMPT)
+_render_api_summary = _compile_prompt(API_SUMMARY_PROMPT)
+_render_api_doc = _compile_prompt(API_DOC_PROMPT)
+_render_api_usage_extract = _compile_prompt(API_USAGE_EXTRACT_PROMPT)
+_render_api_usage_summary = _compile_prompt(API_USAGE_SUMMARY_PROMPT)
+_render_api_usage_module = _compile_prompt(API_USAGE_MODULE_PROMPT)
+_render_api_usage_common = _compile_prompt(API_USAGE_COMMON_PROMPT)
+
+
+def _parse_batch_results(content: str) -> Dict[int, str]:
+    """
+    解析批量提取返回的JSON结果
+
+    Args:
+        content: LLM返回的文本，形如 {"results": [{"id": 0, "detail": "..."}]}
+
+    Returns:
+        编号到detail的映射，格式不符的条目被忽略
+
+    Raises:
+        ValueError: 内容不是合法JSON
+    """
+    text = content.strip()
+    # 兼容模型仍然包了一层 ```json 代码块的情况
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+
+    data = orjson.loads(text)
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        raise ValueError("批量结果缺少 results 数组")
+
+    parsed: Dict[int, str] = {}
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        detail = item.get("detail")
+        if isinstance(item_id, int) and isinstance(detail, str) and detail.strip():
+            parsed[item_id] = detail
+    return parsed
+
+
+# Anthropic直连的连接池上限：长连接跨请求复用，省去每次调用的DNS/TCP/TLS握手
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+
+# 首个token之前的瞬时错误重试次数（服务端过载、网关错误、连接失败）
+# 这是传输层重试：OpenAI格式由SDK的 max_retries 执行，Anthropic直连由 _stream_chat_anthropic 执行，
+# 两条路径互斥，不会叠加。调用方（LLMQueue / LevelProcessor）外层还有按 llm.max_retries 的业务重试，
+# 单次LLM调用最坏的HTTP请求数为 (max_retries + 1) × (TRANSIENT_MAX_RETRIES + 1)，默认配置下为 4 × 3 = 12
+TRANSIENT_MAX_RETRIES = 2
+
+# 可重试的HTTP状态码：限流、服务端错误、网关错误、Anthropic过载
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+
+
+class TransientHTTPError(Exception):
+    """可重试的HTTP错误（限流或服务端暂时不可用）"""
+
+    def __init__(self, status_code: int, body: str, retry_after: Optional[float] = None):
+        super().__init__(f"Anthropic API错误({status_code}): {body}")
+        self.status_code = status_code
+        self.body = body
+        # 服务端通过 Retry-After 要求的最短等待秒数，RetryHandler 以此作为本次退避的下限
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 头部原始值，可以是秒数或HTTP日期
+
+    Returns:
+        需要等待的秒数，缺失或无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# SSE流每次读取的字节数：大块读取减少迭代次数，又不至于拖慢首个token的到达
+SSE_READ_CHUNK_SIZE = 64 * 1024
+
+
+async def _aiter_sse_data(response: "httpx.Response") -> AsyncGenerator[bytes, None]:
+    """
+    逐条产出SSE流中 data 字段的原始字节
+
+    每个网络块整体 split 一次即可切出块内所有完整行（C层扫描换行符），
+    不完整的尾行留到下一块拼接；全程保持bytes，不做逐行UTF-8解码。
+
+    Args:
+        response: httpx流式响应
+
+    Yields:
+        去掉 "data: " 前缀的负载字节
+    """
+    pending = b""
+    async for raw in response.aiter_bytes(chunk_size=SSE_READ_CHUNK_SIZE):
+        lines = (pending + raw).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.startswith(b"data: "):
+                yield line[6:].rstrip(b"\r")
+
+    if pending.startswith(b"data: "):
+        yield pending[6:].rstrip(b"\r")
+
+
 class ContentCollectMode(Enum):
     """流式响应收集模式"""
     CONTENT_ONLY = "content_only"
@@ -870,14 +1101,26 @@ class ContentCollectMode(Enum):
     REASONING_ONLY = "reasoning_only"
 
 
-@dataclass
+# 热路径上的枚举常量：按值查找走普通字典，比较用身份判断
+_API_FORMAT_BY_VALUE: Dict[str, APIFormat] = {fmt.value: fmt for fmt in APIFormat}
+_ANTHROPIC = APIFormat.ANTHROPIC
+_CONTENT_MODES = frozenset({ContentCollectMode.CONTENT_ONLY, ContentCollectMode.WITH_REASONING})
+_REASONING_MODES = frozenset({ContentCollectMode.WITH_REASONING, ContentCollectMode.REASONING_ONLY})
+# Batch任务的终止状态
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+# 表示输出被长度上限截断的结束原因（OpenAI / Anthropic）
+_TRUNCATED_REASONS = frozenset({"length", "max_tokens"})
+
+
+@dataclass(slots=True)
 class ChatMessage:
     """聊天消息"""
     role: str
     content: str
 
     def to_dict(self) -> Dict[str, str]:
-        return asdict(self)
+        # 直接构造字典，避免 dataclasses.asdict 的反射遍历和深拷贝
+        return {"role": self.role, "content": self.content}
 
     @classmethod
     def from_dict(cls, data: Dict[str, str]) -> "ChatMessage":
@@ -885,10 +1128,27 @@ class ChatMessage:
 
     @classmethod
     def from_list(cls, messages: List[Dict[str, str]]) -> List["ChatMessage"]:
-        return [cls.from_dict(msg) for msg in messages]
+        return [cls(role=msg["role"], content=msg["content"]) for msg in messages]
+
+    @staticmethod
+    def from_list_as_dicts(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """规整为只含role/content的字典列表，可直接作为请求体的messages字段"""
+        return [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+
+
+@dataclass(slots=True)
+class DirectoryBundle:
+    """目录总结的输入：目录信息及其子节点文档列表"""
+    name: str
+    path: str
+    docs: List[str]
+
+    def joined(self) -> str:
+        """以分隔线拼接所有子文档"""
+        return "\n\n---\n\n".join(self.docs)
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamCollectResult:
     """流式收集结果"""
     content: str
@@ -910,6 +1170,11 @@ class LLMClient:
         base_url: Optional[str] = None,
         simulate_browser: bool = True,
         verify_ssl: bool = True,
+        timeout: int = 120,
+        http2: bool = False,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        cache: Optional[LLMCache] = None,
     ):
         """
         初始化LLM客户端
@@ -919,6 +1184,11 @@ class LLMClient:
             base_url: API基础URL（中转站地址）
             simulate_browser: 是否模拟浏览器请求头
             verify_ssl: 是否验证SSL证书
+            timeout: 默认超时时间（秒）
+            http2: 是否启用HTTP/2（并发请求复用同一连接）
+            requests_per_minute: 每分钟最大请求数，None则不限流
+            tokens_per_minute: 每分钟最大输入token数，None则不限流
+            cache: 响应缓存，None则不缓存
         """
         # 解析API密钥
         key = self._resolve_env_var(api_key) or os.environ.get("OPENAI_API_KEY")
@@ -933,31 +1203,53 @@ class LLMClient:
         self._base_url = url
         self._simulate_browser = simulate_browser
         self._verify_ssl = verify_ssl
-
-        # 构建浏览器模拟请求头
-        default_headers = {}
-        if simulate_browser:
-            default_headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Sec-Fetch-Dest": "empty",
-                "Sec-Fetch-Mode": "cors",
-                "Sec-Fetch-Site": "same-origin",
-            }
+        self._http2 = http2
+        # 端点在客户端生命周期内不变，初始化时规范化并拼接一次
+        self._anthropic_endpoint = build_anthropic_endpoint(url) if url else None
+        # Anthropic直连使用的长连接客户端，首次请求时创建
+        self._http_client: Optional["httpx.AsyncClient"] = None
+        # 共享客户端的注册键和引用计数（见 acquire_llm_client）
+        self._shared_key: Optional[Tuple[Any, ...]] = None
+        self._refs = 0
+
+        # 请求级限流，平滑突发并发，避免触发服务商的429
+        self._rpm_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self._tpm_bucket = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+
+        self.cache = cache
+
+        # 请求头在客户端生命周期内不变，初始化时构建一次
+        # OpenAI客户端只需浏览器模拟头；Anthropic直连还需认证和版本头
+        browser_headers = get_browser_headers() if simulate_browser else {}
+        self._openai_headers: Dict[str, str] = dict(browser_headers)
+        self._anthropic_headers: Dict[str, str] = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}",
+            "anthropic-version": "2023-06-01",
+            **browser_headers,
+        }
 
         # 创建OpenAI客户端
+        # 启用HTTP/2时传入自定义httpx客户端，并发流式请求共享连接
+        import httpx
+        from openai import AsyncOpenAI
+
         self._client = AsyncOpenAI(
             api_key=key,
             base_url=url,
-            default_headers=default_headers if default_headers else None,
+            default_headers=self._openai_headers or None,
+            # SDK在流开始前对连接错误、429和5xx做指数退避重试
+            max_retries=TRANSIENT_MAX_RETRIES,
+            http_client=httpx.AsyncClient(http2=True, verify=verify_ssl) if http2 else None,
         )
 
+        # with_options每次调用都会克隆客户端，默认超时的克隆只创建一次
+        self._timeout = float(timeout)
+        self._client_with_timeout = self._client.with_options(timeout=self._timeout)
+
         logger.info(
-            f"LLM客户端初始化: base_url={url or '官方API'}, simulate_browser={simulate_browser}, verify_ssl={verify_ssl}"
+            f"LLM客户端初始化: base_url={url or '官方API'}, simulate_browser={simulate_browser}, "
+            f"verify_ssl={verify_ssl}, http2={http2}, rpm={requests_per_minute or '不限'}, tpm={tokens_per_minute or '不限'}"
         )
 
     def _resolve_env_var(self, value: Optional[str]) -> Optional[str]:
@@ -967,18 +1259,32 @@ class LLMClient:
             return os.environ.get(env_var)
         return value
 
-    def _get_anthropic_headers(self) -> Dict[str, str]:
-        """获取Anthropic API请求头"""
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self._api_key}",
-            "anthropic-version": "2023-06-01",
-        }
-
-        if self._simulate_browser:
-            headers.update(get_browser_headers())
+    def _get_http_client(self) -> "httpx.AsyncClient":
+        """获取Anthropic直连使用的长连接客户端，未创建或已关闭时重新创建"""
+        if self._http_client is None or self._http_client.is_closed:
+            import httpx
+
+            self._http_client = httpx.AsyncClient(
+                timeout=self._timeout,
+                verify=self._verify_ssl,
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """关闭底层HTTP连接"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        await self._client.close()
 
-        return headers
+    def _get_anthropic_headers(self) -> Dict[str, str]:
+        """获取Anthropic API请求头（初始化时已构建，httpx不会修改该字典）"""
+        return self._anthropic_headers
 
     async def _stream_chat_anthropic(
         self,
@@ -992,7 +1298,11 @@ class LLMClient:
         """
         使用Anthropic Messages API进行流式聊天请求
         """
-        endpoint = build_anthropic_endpoint(self._base_url)
+        import httpx
+
+        endpoint = self._anthropic_endpoint
+        if not endpoint:
+            raise ValueError("使用Anthropic格式需要配置base_url")
         headers = self._get_anthropic_headers()
 
         # 分离system消息
@@ -1023,58 +1333,87 @@ class LLMClient:
 
         logger.info(f"Anthropic API请求: endpoint={endpoint}, model={model}")
 
+        client = self._get_http_client()
+        request = client.build_request(
+            "POST",
+            endpoint,
+            headers=headers,
+            content=orjson.dumps(payload),
+            timeout=float(timeout),
+        )
+
+        async def open_stream() -> "httpx.Response":
+            """发送请求并等待响应头；服务端过载或网关错误时抛出可重试异常"""
+            response = await client.send(request, stream=True)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                error_text = await response.aread()
+                await response.aclose()
+                raise TransientHTTPError(
+                    response.status_code,
+                    error_text.decode("utf-8", errors="replace")[:500],
+                    retry_after=_parse_retry_after(response.headers.get("retry-after")),
+                )
+            return response
+
+        # 只在收到首个token之前重试：连接失败、等待响应头超时、429/5xx
+        # 流开始后的错误直接抛出，避免重复输出已产出的内容
+        retry_handler = RetryHandler(
+            max_retries=TRANSIENT_MAX_RETRIES,
+            base_delay=1.0,
+            max_delay=30.0,
+            retry_exceptions=(httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError, TransientHTTPError),
+        )
+
         try:
-            async with httpx.AsyncClient(timeout=float(timeout), verify=self._verify_ssl) as client:
-                async with client.stream(
-                    "POST",
-                    endpoint,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status_code != 200:
-                        error_text = await response.aread()
-                        error_msg = error_text.decode("utf-8", errors="replace")[:500]
-                        logger.error(f"Anthropic API错误: status={response.status_code}, response={error_msg}")
-                        raise Exception(f"Anthropic API错误({response.status_code}): {error_msg}")
-
-                    # 解析SSE流式响应
-                    async for line in response.aiter_lines():
-                        if not line or not line.startswith("data: "):
-                            continue
-
-                        data_str = line[6:]
-
-                        if data_str == "[DONE]":
-                            break
-
-                        try:
-                            chunk = json.loads(data_str)
-                            event_type = chunk.get("type", "")
-
-                            if event_type == "content_block_delta":
-                                delta = chunk.get("delta", {})
-                                if delta.get("type") == "text_delta":
-                                    text = delta.get("text", "")
-                                    if text:
-                                        yield {
-                                            "content": text,
-                                            "finish_reason": None,
-                                        }
-                            elif event_type == "message_delta":
-                                stop_reason = chunk.get("delta", {}).get("stop_reason")
-                                if stop_reason:
+            try:
+                response = await retry_handler.execute(open_stream)
+            except RetryExhaustedError as e:
+                # 抛出最后一次的原始异常，保留重试上下文
+                raise e.last_exception from e
+
+            try:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    error_msg = error_text.decode("utf-8", errors="replace")[:500]
+                    logger.error(f"Anthropic API错误: status={response.status_code}, response={error_msg}")
+                    raise Exception(f"Anthropic API错误({response.status_code}): {error_msg}")
+
+                # 解析SSE流式响应
+                async for data in _aiter_sse_data(response):
+                    if data == b"[DONE]":
+                        break
+
+                    try:
+                        # orjson直接解析bytes，只有text字段会被解码为str
+                        chunk = orjson.loads(data)
+                        event_type = chunk.get("type", "")
+
+                        if event_type == "content_block_delta":
+                            delta = chunk.get("delta", {})
+                            if delta.get("type") == "text_delta":
+                                text = delta.get("text", "")
+                                if text:
                                     yield {
-                                        "content": None,
-                                        "finish_reason": stop_reason,
+                                        "content": text,
+                                        "finish_reason": None,
                                     }
-                            elif event_type == "message_stop":
+                        elif event_type == "message_delta":
+                            stop_reason = chunk.get("delta", {}).get("stop_reason")
+                            if stop_reason:
                                 yield {
                                     "content": None,
-                                    "finish_reason": "stop",
+                                    "finish_reason": stop_reason,
                                 }
+                        elif event_type == "message_stop":
+                            yield {
+                                "content": None,
+                                "finish_reason": "stop",
+                            }
 
-                        except json.JSONDecodeError:
-                            continue
+                    except orjson.JSONDecodeError:
+                        continue
+            finally:
+                await response.aclose()
 
         except httpx.TimeoutException as e:
             logger.error(f"Anthropic API超时: model={model}, timeout={timeout}, error={type(e).__name__}")
@@ -1082,6 +1421,9 @@ class LLMClient:
         except httpx.HTTPStatusError as e:
             logger.error(f"Anthropic API HTTP错误: model={model}, status={e.response.status_code}, response={e.response.text[:500]}")
             raise
+        except TransientHTTPError as e:
+            logger.error(f"Anthropic API错误: model={model}, status={e.status_code}, response={e.body}")
+            raise
         except Exception as e:
             error_detail = str(e) or repr(e) or type(e).__name__
             if "Anthropic API错误" not in error_detail:
@@ -1102,7 +1444,7 @@ class LLMClient:
         """
         payload = {
             "model": model,
-            "messages": [msg.to_dict() for msg in messages],
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
             "stream": True,
         }
 
@@ -1114,20 +1456,26 @@ class LLMClient:
         logger.info(f"OpenAI API请求: base_url={self._client.base_url}, model={model}")
 
         try:
-            stream = await self._client.with_options(timeout=float(timeout)).chat.completions.create(**payload)
+            if float(timeout) == self._timeout:
+                client = self._client_with_timeout
+            else:
+                client = self._client.with_options(timeout=float(timeout))
+            stream = await client.chat.completions.create(**payload)
             async for chunk in stream:
                 if not chunk.choices:
                     continue
                 choice = chunk.choices[0]
+                delta = choice.delta
 
                 result = {
-                    "content": choice.delta.content,
+                    "content": delta.content,
                     "finish_reason": choice.finish_reason,
                 }
 
-                # 支持DeepSeek R1的reasoning_content
-                if hasattr(choice.delta, "reasoning_content") and choice.delta.reasoning_content:
-                    result["reasoning_content"] = choice.delta.reasoning_content
+                # 支持DeepSeek R1的reasoning_content（单次属性查找）
+                reasoning_content = getattr(delta, "reasoning_content", None)
+                if reasoning_content:
+                    result["reasoning_content"] = reasoning_content
 
                 yield result
 
@@ -1156,15 +1504,16 @@ class LLMClient:
             timeout: 超时时间
             api_format: 强制指定API格式，为None则自动检测
         """
-        # 确定API格式
-        if api_format:
-            detected_format = APIFormat(api_format)
-        else:
-            detected_format = detect_api_format(model)
+        detected_format = self._resolve_api_format(model, api_format)
 
         logger.info(f"LLM请求: model={model}, api_format={detected_format.value}")
 
-        if detected_format == APIFormat.ANTHROPIC:
+        if self._rpm_bucket:
+            await self._rpm_bucket.acquire()
+        if self._tpm_bucket:
+            await self._tpm_bucket.acquire(sum(count_tokens(msg.content) for msg in messages))
+
+        if detected_format is _ANTHROPIC:
             async for chunk in self._stream_chat_anthropic(
                 messages=messages,
                 model=model,
@@ -1199,41 +1548,57 @@ class LLMClient:
         """
         流式请求并收集完整响应
         """
-        content = ""
-        reasoning = ""
+        # 以片段列表收集，结束后一次性拼接，避免长文档逐块拼接字符串的重复拷贝
+        content_parts: List[str] = []
+        reasoning_parts: List[str] = []
         finish_reason = None
         chunk_count = 0
 
+        stream = self.stream_chat(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            api_format=api_format,
+            **kwargs,
+        )
+
+        # 收集模式在进入循环前确定，循环体内不再做模式判断
         try:
-            async for chunk in self.stream_chat(
-                messages=messages,
-                model=model,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout,
-                api_format=api_format,
-                **kwargs,
-            ):
-                chunk_count += 1
+            if collect_mode in _CONTENT_MODES and collect_mode in _REASONING_MODES:
+                async for chunk in stream:
+                    chunk_count += 1
 
-                if collect_mode in (ContentCollectMode.CONTENT_ONLY, ContentCollectMode.WITH_REASONING):
                     if chunk.get("content"):
-                        content += chunk["content"]
-
-                if collect_mode in (ContentCollectMode.WITH_REASONING, ContentCollectMode.REASONING_ONLY):
+                        content_parts.append(chunk["content"])
                     if chunk.get("reasoning_content"):
-                        reasoning += chunk["reasoning_content"]
+                        reasoning_parts.append(chunk["reasoning_content"])
+                    if chunk.get("finish_reason"):
+                        finish_reason = chunk["finish_reason"]
+            else:
+                # 只收集单一字段：content 或 reasoning_content
+                if collect_mode in _CONTENT_MODES:
+                    key, parts = "content", content_parts
+                else:
+                    key, parts = "reasoning_content", reasoning_parts
+
+                async for chunk in stream:
+                    chunk_count += 1
 
-                if chunk.get("finish_reason"):
-                    finish_reason = chunk["finish_reason"]
+                    value = chunk.get(key)
+                    if value:
+                        parts.append(value)
+                    if chunk.get("finish_reason"):
+                        finish_reason = chunk["finish_reason"]
 
         except Exception as e:
             logger.error(f"stream_and_collect失败: model={model}, chunks={chunk_count}, error={e}")
             raise
 
         return StreamCollectResult(
-            content=content,
-            reasoning=reasoning,
+            content="".join(content_parts),
+            reasoning="".join(reasoning_parts),
             finish_reason=finish_reason,
             chunk_count=chunk_count,
         )
@@ -1247,19 +1612,30 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         timeout: int = 120,
         api_format: Optional[str] = None,
+        cache: bool = True,
     ) -> str:
         """
         便捷方法：发送单轮对话请求并收集结果
-        """
-        messages = []
 
-        if system:
-            messages.append(ChatMessage(role="system", content=system))
-
-        messages.append(ChatMessage(role="user", content=prompt))
+        Args:
+            cache: 是否使用响应缓存（客户端未配置缓存时无效）
+        """
+        cache_key = None
+        if cache and self.cache is not None:
+            cache_key = LLMCache.make_key(
+                prompt, model,
+                system=system,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_format=api_format,
+                base_url=self._base_url,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         result = await self.stream_and_collect(
-            messages=messages,
+            messages=self._build_messages(prompt, system),
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
@@ -1267,8 +1643,227 @@ class LLMClient:
             api_format=api_format,
         )
 
+        # 空内容和因长度截断的内容不缓存，留给下次重新生成
+        if cache_key is not None and result.content and result.finish_reason not in _TRUNCATED_REASONS:
+            self.cache.put(cache_key, result.content)
+
         return result.content
 
+    # ============ Batch API（离线批处理，仅OpenAI格式） ============
+
+    async def submit_batch(
+        self,
+        requests: List[Tuple[str, str]],
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """
+        提交OpenAI Batch API任务
+
+        批处理不占用实时RPM配额，费用约为实时调用的一半，但结果最长24小时内返回，
+        只适合非交互的离线文档生成。
+
+        Args:
+            requests: (custom_id, prompt) 列表，custom_id 在批内唯一
+            model: 模型名称
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Returns:
+            批处理任务ID
+        """
+        lines = []
+        for custom_id, prompt in requests:
+            body: Dict[str, Any] = {
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+            }
+            if temperature is not None:
+                body["temperature"] = temperature
+            if max_tokens is not None:
+                body["max_tokens"] = max_tokens
+            lines.append(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+
+        batch_file = await self._client.files.create(
+            file=("batch.jsonl", b"\n".join(lines)),
+            purpose="batch",
+        )
+        batch = await self._client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+        logger.info(f"Batch任务已提交: batch_id={batch.id}, requests={len(requests)}")
+        return batch.id
+
+    async def poll_batch(
+        self,
+        batch_id: str,
+        interval: float = 30.0,
+        max_wait: Optional[float] = None,
+    ) -> str:
+        """
+        轮询批处理任务直到结束或超时
+
+        超过 max_wait 或轮询协程被取消时，会请求服务端取消该批处理任务，
+        已完成的部分结果仍可通过 fetch_batch_results 获取。
+
+        Args:
+            batch_id: 批处理任务ID
+            interval: 轮询间隔（秒）
+            max_wait: 最长等待时间（秒），None表示不限
+
+        Returns:
+            最终状态（completed/failed/expired/cancelled），超时返回 "timeout"
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        try:
+            while True:
+                batch = await self._client.batches.retrieve(batch_id)
+                if batch.status in _BATCH_FINAL_STATUSES:
+                    logger.info(f"Batch任务结束: batch_id={batch_id}, status={batch.status}")
+                    return batch.status
+
+                counts = batch.request_counts
+                if counts:
+                    logger.debug(
+                        f"Batch任务进行中: batch_id={batch_id}, status={batch.status}, "
+                        f"completed={counts.completed}/{counts.total}"
+                    )
+
+                if deadline is not None and time.monotonic() + interval > deadline:
+                    logger.warning(f"Batch任务等待超时({max_wait}秒)，取消任务: batch_id={batch_id}")
+                    await self._cancel_batch(batch_id)
+                    return "timeout"
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._cancel_batch(batch_id))
+            raise
+
+    async def _cancel_batch(self, batch_id: str) -> None:
+        """请求取消批处理任务（尽力而为，失败只记录日志）"""
+        try:
+            await self._client.batches.cancel(batch_id)
+        except Exception as e:
+            logger.warning(f"取消Batch任务失败: batch_id={batch_id}, {e}")
+
+    async def fetch_batch_results(self, batch_id: str) -> Dict[str, str]:
+        """
+        下载批处理结果
+
+        Args:
+            batch_id: 批处理任务ID
+
+        Returns:
+            custom_id 到响应内容的映射；失败的请求不在结果中
+        """
+        batch = await self._client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return {}
+
+        output = await self._client.files.content(batch.output_file_id)
+
+        results: Dict[str, str] = {}
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
+            # 单行损坏只丢弃该条结果，对应请求由调用方回退为实时调用
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.warning(f"Batch结果行解析失败，已跳过: {e}")
+                continue
+            custom_id = record.get("custom_id")
+            response = record.get("response") or {}
+            if custom_id is None or response.get("status_code") != 200:
+                continue
+            choices = (response.get("body") or {}).get("choices") or []
+            content = choices[0].get("message", {}).get("content") if choices else None
+            if content:
+                results[custom_id] = content
+
+        return results
+
+    @staticmethod
+    def _resolve_api_format(model: str, api_format: Optional[str] = None) -> APIFormat:
+        """确定API格式：显式指定优先，否则按模型名自动检测"""
+        if api_format:
+            return _API_FORMAT_BY_VALUE.get(api_format) or APIFormat(api_format)
+        return detect_api_format(model)
+
+    @staticmethod
+    def _build_messages(prompt: str, system: Optional[str] = None) -> List[ChatMessage]:
+        """构建单轮对话的消息列表"""
+        messages = []
+
+        if system:
+            messages.append(ChatMessage(role="system", content=system))
+
+        messages.append(ChatMessage(role="user", content=prompt))
+
+        return messages
+
+
+# ============ 共享客户端管理 ============
+# 以构造参数为键复用 LLMClient，多个 LLMService 共享连接池、限流桶和缓存。
+# 用引用计数而非 lru_cache：最后一个使用者释放时关闭并移出注册表，之后可重新创建
+
+_shared_clients: Dict[Tuple[Any, ...], LLMClient] = {}
+
+
+def acquire_llm_client(
+    cache_dir: Optional[str] = None,
+    cache_ttl: Optional[int] = None,
+    **options: Any,
+) -> LLMClient:
+    """
+    获取共享的LLM客户端，引用计数加一
+
+    Args:
+        cache_dir: 响应缓存目录，None则不缓存
+        cache_ttl: 缓存有效期（秒）
+        **options: LLMClient 的其余构造参数
+
+    Returns:
+        与参数对应的共享客户端
+    """
+    key = (cache_dir, cache_ttl, *sorted(options.items()))
+    client = _shared_clients.get(key)
+
+    if client is None:
+        client = LLMClient(
+            **options,
+            cache=LLMCache(cache_dir, ttl=cache_ttl) if cache_dir else None,
+        )
+        client._shared_key = key
+        _shared_clients[key] = client
+
+    client._refs += 1
+    return client
+
+
+async def release_llm_client(client: LLMClient) -> None:
+    """
+    释放LLM客户端，引用计数归零时关闭连接
+
+    Args:
+        client: acquire_llm_client 返回的客户端（非共享客户端直接关闭）
+    """
+    client._refs -= 1
+    if client._refs > 0:
+        return
+
+    if client._shared_key is not None:
+        _shared_clients.pop(client._shared_key, None)
+    await client.aclose()
+
 
 class LLMService:
     """
@@ -1281,13 +1876,20 @@ class LLMService:
         """初始化LLM服务"""
         self.config = config or get_config().llm
 
-        # 创建LLM客户端
-        self.client = LLMClient(
+        # 获取LLM客户端：配置相同的服务共用同一个客户端（连接池、限流桶、缓存）
+        self.client = acquire_llm_client(
             api_key=self.config.api_key,
             base_url=self.config.base_url,
             simulate_browser=self.config.simulate_browser,
             verify_ssl=self.config.verify_ssl,
+            timeout=self.config.timeout,
+            http2=self.config.http2,
+            requests_per_minute=self.config.rate_limit_rpm,
+            tokens_per_minute=self.config.rate_limit_tpm,
+            cache_dir=self.config.cache_dir if self.config.cache_enabled else None,
+            cache_ttl=self.config.cache_ttl,
         )
+        self.cache = self.client.cache
 
         # 保存配置
         self.model = self.config.model
@@ -1295,13 +1897,126 @@ class LLMService:
         self.timeout = self.config.timeout
         self.temperature = self.config.temperature
         self.max_tokens = self.config.max_tokens
+        self.max_input_tokens = self.config.max_input_tokens
+        self.context_window = self.config.context_window
+
+    async def aclose(self) -> None:
+        """释放LLM客户端，最后一个使用者释放时关闭连接"""
+        await release_llm_client(self.client)
+
+    async def __aenter__(self) -> "LLMService":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def _complete_doc_chunks(
+        self,
+        render: Callable[..., str],
+        file_path: str,
+        file_doc: str,
+        max_tokens: int,
+    ) -> List[str]:
+        """
+        以文件文档填充Prompt并调用LLM，超出上下文窗口时按语义边界分块逐块调用
+
+        未配置 context_window 时总是单次调用。调用方已占用 LevelProcessor 的一个并发名额，
+        各块在该名额内顺序执行，大文档不会突破 max_concurrent。
+
+        Args:
+            render: Prompt渲染函数，接收 file_path 和 file_doc
+            file_path: 文件路径
+            file_doc: 文件的分析文档内容
+            max_tokens: 最大生成token数
+
+        Returns:
+            各块的响应，按文档顺序排列（未分块时只有一条）
+        """
+        chunks = [file_doc]
+        if self.context_window:
+            overhead = count_tokens(render(file_path=file_path, file_doc=""))
+            budget = self.context_window - max_tokens - overhead - CONTEXT_SAFETY_TOKENS
+            if budget > 0:
+                chunks = split_by_tokens(file_doc, budget)
+            else:
+                logger.warning(
+                    f"context_window过小，无法容纳Prompt和输出，跳过分块: "
+                    f"context_window={self.context_window}, max_tokens={max_tokens}"
+                )
+
+        if len(chunks) > 1:
+            logger.info(f"文档超出上下文窗口，分 {len(chunks)} 块处理: {file_path}")
+
+        results = []
+        for chunk in chunks:
+            results.append(await self.client.complete(
+                prompt=render(file_path=file_path, file_doc=chunk),
+                model=self.model,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                timeout=self.timeout,
+                api_format=self.api_format,
+            ))
+        return results
+
+    @property
+    def batch_api_enabled(self) -> bool:
+        """是否使用Batch API批量分析代码文件（需开启 use_batch_api 且为OpenAI格式）"""
+        return bool(
+            self.config
+            and self.config.use_batch_api
+            and LLMClient._resolve_api_format(self.model, self.api_format) is not _ANTHROPIC
+        )
+
+    async def analyze_codes_batch(self, files: List[Tuple[str, str]]) -> Dict[int, str]:
+        """
+        通过Batch API批量分析多个代码文件
+
+        低成本、不占RPM，但延迟以小时计。等待超过 batch_max_wait 时取消任务，
+        只返回已完成的部分。
+
+        Args:
+            files: (文件路径, 代码内容) 列表
+
+        Returns:
+            输入下标到分析结果的映射；失败、超时或结果损坏的文件不在其中，由调用方回退为实时调用
+        """
+        if not files:
+            return {}
+
+        requests = []
+        for i, (file_path, code_content) in enumerate(files):
+            if self.max_input_tokens:
+                code_content = truncate_middle(code_content, self.max_input_tokens)
+            prompt = _code_analysis_head(file_path) + code_content + _CODE_ANALYSIS_TAIL
+            requests.append((str(i), prompt))
+
+        batch_id = await self.client.submit_batch(
+            requests,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=max(self.max_tokens or CODE_ANALYSIS_MIN_TOKENS, CODE_ANALYSIS_MIN_TOKENS),
+        )
+        await self.client.poll_batch(
+            batch_id,
+            interval=self.config.batch_poll_interval,
+            max_wait=self.config.batch_max_wait,
+        )
+        results = await self.client.fetch_batch_results(batch_id)
+
+        return {
+            int(custom_id): content
+            for custom_id, content in results.items()
+            if custom_id.isdigit() and int(custom_id) < len(files)
+        }
 
     async def analyze_code(self, file_path: str, code_content: str) -> str:
         """分析代码文件"""
-        prompt = CODE_ANALYSIS_PROMPT.format(
-            file_path=file_path,
-            code_content=code_content
-        )
+        # 超长文件保留头尾、截断中间，减少输入token和传输字节
+        if self.max_input_tokens:
+            code_content = truncate_middle(code_content, self.max_input_tokens)
+
+        prompt = _code_analysis_head(file_path) + code_content + _CODE_ANALYSIS_TAIL
 
         # 使用配置的max_tokens，但确保不低于CODE_ANALYSIS_MIN_TOKENS
         # 这是为了防止大型文件（如api_server.py）的API信息因token限制被截断
@@ -1326,7 +2041,7 @@ class LLMService:
         sub_documents: str
     ) -> str:
         """合并子模块文档，生成目录级总结"""
-        prompt = DIRECTORY_SUMMARY_PROMPT.format(
+        prompt = _render_directory_summary(
             dir_name=dir_name,
             dir_path=dir_path,
             sub_documents=sub_documents
@@ -1341,6 +2056,17 @@ class LLMService:
             api_format=self.api_format,
         )
 
+    async def summarize_directory_bundle(self, bundle: DirectoryBundle) -> str:
+        """
+        根据目录输入包生成目录级总结
+
+        子文档在真正构造Prompt时才拼接
+
+        Args:
+            bundle: 目录名、路径及子文档列表
+        """
+        return await self.summarize_directory(bundle.name, bundle.path, bundle.joined())
+
     async def generate_readme(
         self,
         project_name: str,
@@ -1348,7 +2074,7 @@ class LLMService:
         all_documents: str
     ) -> str:
         """生成最终的README文档"""
-        prompt = README_PROMPT.format(
+        prompt = _render_readme(
             project_name=project_name,
             project_path=project_path,
             all_documents=all_documents
@@ -1373,7 +2099,7 @@ class LLMService:
         all_documents: str
     ) -> str:
         """生成项目文档阅读顺序指南"""
-        prompt = READING_GUIDE_PROMPT.format(
+        prompt = _render_reading_guide(
             project_name=project_name,
             project_structure=project_structure,
             all_documents=all_documents
@@ -1398,7 +2124,7 @@ class LLMService:
         all_documents: str
     ) -> str:
         """生成API接口文档（旧方法，保留兼容性）"""
-        prompt = API_DOC_PROMPT.format(
+        prompt = _render_api_doc(
             project_name=project_name,
             project_structure=project_structure,
             all_documents=all_documents
@@ -1431,21 +2157,98 @@ class LLMService:
         Returns:
             提取的接口详情（结构化文本）
         """
-        prompt = API_EXTRACT_PROMPT.format(
-            file_path=file_path,
-            file_doc=file_doc
+        # 单文件提取使用较大的max_tokens，避免大型API文件被截断
+        results = await self._complete_doc_chunks(
+            _render_api_extract,
+            file_path,
+            file_doc,
+            max_tokens=self.max_tokens or FINAL_DOC_MAX_TOKENS,
         )
 
-        # 单文件提取使用较大的max_tokens，避免大型API文件被截断
-        return await self.client.complete(
+        # 分块提取时，只保留找到接口的块；全部没有接口时保留一条说明
+        found = [r for r in results if NO_API_MARKER not in r]
+        return "\n\n".join(found) if found else results[0]
+
+    async def extract_api_details_batch(
+        self,
+        items: List[Tuple[str, str]],
+    ) -> Dict[str, str]:
+        """
+        第一阶段（批量）：一次请求提取多个文件的API接口详情
+
+        将多个文件的分析文档以分隔符包裹合并为一个Prompt，要求模型返回JSON，
+        N个文件只需一次网络往返。
+
+        Args:
+            items: (文件路径, 文件分析文档) 列表
+
+        Returns:
+            文件路径到接口详情的映射；JSON解析失败或缺失的文件不在结果中，
+            由调用方回退为逐个调用 extract_api_details
+        """
+        if not items:
+            return {}
+
+        blocks = [
+            f"<<FILE id={i} path={file_path}>>\n{file_doc}\n<<END>>"
+            for i, (file_path, file_doc) in enumerate(items)
+        ]
+        prompt = _render_api_extract_batch(files_block="\n\n".join(blocks))
+        max_tokens = self.max_tokens or FINAL_DOC_MAX_TOKENS
+
+        # 缓存由本方法自行管理：只有能解析成功的结果才写入，
+        # 避免一次格式错误的响应被缓存后永远重放
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(
+                prompt, self.model,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                api_format=self.api_format,
+                base_url=self.client._base_url,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    parsed = _parse_batch_results(cached)
+                    return self._map_batch_results(items, parsed)
+                except ValueError:
+                    pass
+
+        content = await self.client.complete(
             prompt=prompt,
             model=self.model,
             temperature=self.temperature,
-            max_tokens=self.max_tokens or FINAL_DOC_MAX_TOKENS,
+            max_tokens=max_tokens,
             timeout=self.timeout,
             api_format=self.api_format,
+            cache=False,
         )
 
+        try:
+            parsed = _parse_batch_results(content)
+        except ValueError as e:
+            logger.warning(f"批量API详情结果解析失败，将回退为逐个提取: files={len(items)}, error={e}")
+            return {}
+
+        if cache_key is not None:
+            self.cache.put(cache_key, content)
+
+        return self._map_batch_results(items, parsed)
+
+    @staticmethod
+    def _map_batch_results(
+        items: List[Tuple[str, str]],
+        parsed: Dict[int, str],
+    ) -> Dict[str, str]:
+        """将批量结果的序号映射回文件路径，缺失的文件不在结果中"""
+
+        return {
+            file_path: parsed[i]
+            for i, (file_path, _) in enumerate(items)
+            if i in parsed
+        }
+
     async def summarize_api_docs(
         self,
         project_name: str,
@@ -1461,7 +2264,7 @@ class LLMService:
         Returns:
             最终的API接口文档
         """
-        prompt = API_SUMMARY_PROMPT.format(
+        prompt = _render_api_summary(
             project_name=project_name,
             api_details=api_details
         )
@@ -1495,22 +2298,16 @@ class LLMService:
         Returns:
             提取的API使用详情（包含请求示例、响应示例等）
         """
-        prompt = API_USAGE_EXTRACT_PROMPT.format(
-            file_path=file_path,
-            file_doc=file_doc
-        )
-
         # 使用较大的max_tokens，因为需要生成详细的示例
         # 大型API文件（如agentserver/agent_server.py含27个接口）需要更多tokens
         # 每个接口详情约需400-600 tokens，使用FINAL_DOC_MAX_TOKENS更安全
-        return await self.client.complete(
-            prompt=prompt,
-            model=self.model,
-            temperature=self.temperature,
+        results = await self._complete_doc_chunks(
+            _render_api_usage_extract,
+            file_path,
+            file_doc,
             max_tokens=self.max_tokens or FINAL_DOC_MAX_TOKENS,
-            timeout=self.timeout,
-            api_format=self.api_format,
         )
+        return "\n\n".join(results)
 
     async def summarize_api_usage_docs(
         self,
@@ -1533,7 +2330,7 @@ class LLMService:
         if not api_reference_list:
             api_reference_list = "（未提供接口清单，请根据使用详情生成文档）"
 
-        prompt = API_USAGE_SUMMARY_PROMPT.format(
+        prompt = _render_api_usage_summary(
             project_name=project_name,
             api_usage_details=api_usage_details,
             api_reference_list=api_reference_list
@@ -1572,7 +2369,7 @@ class LLMService:
         Returns:
             该模块的接口使用文档
         """
-        prompt = API_USAGE_MODULE_PROMPT.format(
+        prompt = _render_api_usage_module(
             project_name=project_name,
             module_name=module_name,
             module_api_list=module_api_list,
@@ -1608,7 +2405,7 @@ class LLMService:
         Returns:
             通用部分的文档内容
         """
-        prompt = API_USAGE_COMMON_PROMPT.format(
+        prompt = _render_api_usage_common(
             project_name=project_name,
             api_overview=api_overview,
             api_usage_details=api_usage_details
@@ -1630,6 +2427,10 @@ class MockLLMService(LLMService):
     def __init__(self):
         self.config = None
         self.client = None
+        self.cache = None
+
+    async def aclose(self) -> None:
+        pass
 
     async def analyze_code(self, file_path: str, code_content: str) -> str:
         return f"[模拟分析] 文件: {file_path}\n代码行数: {len(code_content.splitlines())}"
@@ -1642,6 +2443,10 @@ class MockLLMService(LLMService):
     ) -> str:
         return f"[模拟总结] 目录: {dir_name}\n子文档数: {sub_documents.count('---')}"
 
+    async def summarize_directory_bundle(self, bundle: DirectoryBundle) -> str:
+        # 不拼接子文档，直接按列表长度统计
+        return f"[模拟总结] 目录: {bundle.name}\n子文档数: {len(bundle.docs)}"
+
     async def generate_readme(
         self,
         project_name: str,
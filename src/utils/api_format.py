@@ -2,8 +2,12 @@
 API格式工具模块
 提供API格式检测、URL构建等工具函数
 """
+import re
 from enum import Enum
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+from urllib.parse import urlsplit, urlunsplit
 
 from src.utils.logger import get_logger
 
@@ -16,14 +20,23 @@ class APIFormat(Enum):
     ANTHROPIC = "anthropic"    # Anthropic Messages API
 
 
+_REPEATED_SLASHES = re.compile(r"/{2,}")
+
+# 模型名中出现这些子串时使用Anthropic格式；新增提供商只需在此追加
+_ANTHROPIC_MARKERS = ("claude",)
+
+
+@lru_cache(maxsize=64)
 def detect_api_format(model_name: str) -> APIFormat:
     """
     根据模型名称自动检测API格式
 
     规则：
-    - 模型名包含 'claude' -> Anthropic格式
+    - 模型名包含 _ANTHROPIC_MARKERS 中的任一子串（如 'claude'） -> Anthropic格式
     - 其他模型 -> OpenAI格式（兼容大多数中转站）
 
+    一次运行中出现的模型名很少，结果按模型名缓存。
+
     Args:
         model_name: 模型名称
 
@@ -36,7 +49,7 @@ def detect_api_format(model_name: str) -> APIFormat:
     model_lower = model_name.lower()
 
     # Claude系列模型使用Anthropic格式
-    if "claude" in model_lower:
+    if any(marker in model_lower for marker in _ANTHROPIC_MARKERS):
         return APIFormat.ANTHROPIC
 
     # 其他模型使用OpenAI格式（GPT、DeepSeek、通义千问、Llama等）
@@ -45,25 +58,19 @@ def detect_api_format(model_name: str) -> APIFormat:
 
 def fix_base_url(base_url: str) -> str:
     """
-    修复base_url中可能存在的问题
+    规范化base_url
 
     - 移除尾部斜杠
-    - 修复双斜杠问题
+    - 合并路径中的连续斜杠（协议部分的 :// 不受影响）
     """
     if not base_url:
         return base_url
 
-    fixed_url = base_url.rstrip("/")
-
-    # 检查是否存在双斜杠（排除协议部分的://）
-    url_without_protocol = fixed_url.replace("https://", "").replace("http://", "")
-    if "//" in url_without_protocol:
-        # 修复双斜杠
-        fixed_url = (
-            fixed_url.replace("//v1", "/v1")
-            .replace("//messages", "/messages")
-            .replace("//chat", "/chat")
-        )
+    parts = urlsplit(base_url)
+    path = _REPEATED_SLASHES.sub("/", parts.path).rstrip("/")
+    fixed_url = urlunsplit((parts.scheme, parts.netloc, path, parts.query, parts.fragment))
+
+    if path != parts.path.rstrip("/"):
         logger.warning(f"base_url包含双斜杠，已自动修复: {base_url} -> {fixed_url}")
 
     return fixed_url
@@ -107,20 +114,25 @@ def build_openai_endpoint(base_url: str) -> str:
         return f"{base}/v1/chat/completions"
 
 
-def get_browser_headers() -> Dict[str, str]:
+# 模拟浏览器的请求头，只读常量，模块加载时构建一次
+_BROWSER_HEADERS: Mapping[str, str] = MappingProxyType({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "DNT": "1",
+    "Connection": "keep-alive",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin",
+})
+
+
+def get_browser_headers() -> Mapping[str, str]:
     """
     获取模拟浏览器的请求头
 
-    用于绕过一些API中转站的Cloudflare检测
+    用于绕过一些API中转站的Cloudflare检测。
+    返回只读映射，需要修改时请先 dict() 复制
     """
-    return {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "DNT": "1",
-        "Connection": "keep-alive",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-origin",
-    }
+    return _BROWSER_HEADERS
@@ -0,0 +1,36 @@
+"""
+事件循环工具模块
+在可用时切换到基于libuv的高性能事件循环
+"""
+import asyncio
+import sys
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def install_fast_event_loop() -> bool:
+    """
+    安装高性能事件循环策略
+
+    - Linux/macOS: uvloop
+    - Windows: winloop（uvloop不支持Windows）
+
+    未安装对应的包时保持asyncio默认事件循环，不影响功能。
+    需在 asyncio.run() 之前调用。
+
+    Returns:
+        是否已切换到高性能事件循环
+    """
+    try:
+        if sys.platform == "win32":
+            import winloop as loop_impl
+        else:
+            import uvloop as loop_impl
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(loop_impl.EventLoopPolicy())
+    logger.debug(f"已启用 {loop_impl.__name__} 事件循环")
+    return True
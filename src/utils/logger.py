@@ -2,9 +2,17 @@
 日志工具模块
 基于loguru实现统一的日志管理
 """
+import asyncio
+import gzip
+import os
+import queue
+import re
+import shutil
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional
 
 from loguru import logger
 
@@ -20,6 +28,12 @@ LOG_FORMAT = (
     "<level>{message}</level>"
 )
 
+# 日志文件写缓冲区大小（字节）
+FILE_BUFFER_SIZE = 8192
+
+# 日志文件定时刷盘间隔（秒）：日志量小、缓冲区长时间写不满时，最多延迟这么久落盘
+FILE_FLUSH_INTERVAL = 1.0
+
 # 简洁格式（用于控制台）
 CONSOLE_FORMAT = (
     "<green>{time:HH:mm:ss}</green> | "
@@ -28,11 +42,214 @@ CONSOLE_FORMAT = (
 )
 
 
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+# 当前注册的异步文件sink，shutdown_logger 时关闭
+_async_sink: Optional["AsyncFileSink"] = None
+
+
+def _parse_size(size: str) -> int:
+    """将 "10 MB" 形式的大小解析为字节数"""
+    match = _SIZE_PATTERN.match(size)
+    if not match:
+        raise ValueError(f"异步日志文件只支持按大小轮转，如 '10 MB': {size}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+class AsyncFileSink:
+    """
+    基于aiofiles的异步日志文件sink
+
+    loguru将每条消息作为任务调度到当前事件循环，写文件在线程池中完成，
+    协程中记录日志不会阻塞事件循环。写入经锁串行化，保证消息顺序。
+    消息先在内存中累积，达到缓冲区大小后合并为一次写入，突发日志只需少量线程池调度和系统调用。
+    只记录事件循环运行期间的日志，写入将超过轮转大小时先将当前文件加时间戳改名后新建。
+    """
+
+    def __init__(self, path: Path, rotation_bytes: int, buffering: int = FILE_BUFFER_SIZE):
+        """
+        初始化sink
+
+        Args:
+            path: 日志文件路径
+            rotation_bytes: 单个文件的最大字节数
+            buffering: 缓冲区大小（字节），累积到该大小才写文件，0表示每条消息立即写入
+        """
+        self._path = path
+        self._rotation_bytes = rotation_bytes
+        self._buffering = buffering
+        self._file: Any = None
+        self._size = 0
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, message: str) -> None:
+        async with self._lock:
+            self._pending.append(message)
+            self._pending_bytes += len(message.encode("utf-8"))
+            if self._pending_bytes >= self._buffering:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        """将缓冲的消息合并写入文件（调用方需持有锁）"""
+        if not self._pending:
+            return
+
+        data = "".join(self._pending)
+        nbytes = self._pending_bytes
+        self._pending.clear()
+        self._pending_bytes = 0
+
+        if self._file is None:
+            await self._open()
+
+        # 写入前检查：本次写入会超过轮转大小时先轮转，文件大小不会超出上限一个缓冲区
+        # （单次缓冲本身超过轮转大小时仍整体写入新文件）
+        if self._size > 0 and self._size + nbytes > self._rotation_bytes:
+            await self._rotate()
+
+        await self._file.write(data)
+        self._size += nbytes
+
+    async def _open(self) -> None:
+        """打开（或新建）当前日志文件，stat 放到线程池执行"""
+        import aiofiles
+
+        self._file = await aiofiles.open(self._path, "a", encoding="utf-8")
+        stat = await asyncio.to_thread(self._path.stat)
+        self._size = stat.st_size
+
+    async def _rotate(self) -> None:
+        """关闭当前文件并改名归档，然后新建文件；改名等文件系统操作放到线程池执行"""
+        await self._file.close()
+        self._file = None
+        await asyncio.to_thread(lambda: self._path.rename(self._rotated_path()))
+        await self._open()
+
+    def _rotated_path(self) -> Path:
+        """轮转文件名：时间戳精确到秒，同一秒内多次轮转时追加序号，避免覆盖之前的文件"""
+        stem = f"{self._path.stem}.{time.strftime('%Y-%m-%d_%H-%M-%S')}"
+        rotated = self._path.with_name(f"{stem}{self._path.suffix}")
+        index = 1
+        while rotated.exists():
+            rotated = self._path.with_name(f"{stem}.{index}{self._path.suffix}")
+            index += 1
+        return rotated
+
+    async def aclose(self) -> None:
+        """刷新并关闭日志文件"""
+        async with self._lock:
+            await self._flush()
+            if self._file is not None:
+                await self._file.close()
+                self._file = None
+
+
+# ============ 轮转文件后台压缩 ============
+# loguru在写日志的线程里同步执行压缩，大文件gzip可能耗时数秒，期间所有日志写入都被阻塞。
+# 这里的压缩回调只把文件路径放进队列，由独立的守护线程完成压缩
+
+_compression_queue: "queue.Queue[str]" = queue.Queue()
+_compression_thread: Optional[threading.Thread] = None
+_compression_thread_lock = threading.Lock()
+
+
+def _gzip_file(path: str) -> None:
+    """将文件压缩为 .gz，成功后删除原文件"""
+    with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+def _compression_worker() -> None:
+    """后台压缩线程：依次处理队列中的轮转文件"""
+    while True:
+        path = _compression_queue.get()
+        try:
+            _gzip_file(path)
+        except OSError as e:
+            # 不能再写日志（可能递归触发轮转），直接输出到stderr；原文件保留不丢数据
+            sys.stderr.write(f"日志文件压缩失败: {path}, {e}\n")
+        finally:
+            _compression_queue.task_done()
+
+
+def _compress_in_background(path: str) -> None:
+    """loguru压缩回调：把轮转下来的文件交给后台线程压缩"""
+    global _compression_thread
+
+    with _compression_thread_lock:
+        if _compression_thread is None:
+            _compression_thread = threading.Thread(
+                target=_compression_worker,
+                name="log-compression",
+                daemon=True,
+            )
+            _compression_thread.start()
+
+    _compression_queue.put(path)
+
+
+# ============ 文件sink定时刷盘 ============
+# loguru的文件sink只调用 file.write，缓冲区写满或关闭时才真正落盘；日志量小时内容会一直停留在内存中，
+# 进程崩溃即丢失。这里由守护线程定时对已注册的文件sink调用 flush()
+
+_flush_handler_ids: List[int] = []
+_flush_thread: Optional[threading.Thread] = None
+_flush_lock = threading.Lock()
+
+
+def _flush_file_sinks() -> None:
+    """刷新所有已注册的文件sink；loguru内部结构变化或文件正在轮转时跳过"""
+    handlers = getattr(getattr(logger, "_core", None), "handlers", {})
+    with _flush_lock:
+        handler_ids = list(_flush_handler_ids)
+    for handler_id in handler_ids:
+        sink = getattr(handlers.get(handler_id), "_sink", None)
+        file = getattr(sink, "_file", None)
+        if file is None:
+            continue
+        try:
+            file.flush()
+        except (ValueError, OSError):
+            # 轮转中文件已关闭或磁盘错误，下个周期再试
+            pass
+
+
+def _flush_worker(interval: float) -> None:
+    """后台刷盘线程"""
+    while True:
+        time.sleep(interval)
+        _flush_file_sinks()
+
+
+def _register_periodic_flush(handler_id: int, interval: float) -> None:
+    """为文件sink注册定时刷盘，首次注册时启动后台线程"""
+    global _flush_thread
+
+    with _flush_lock:
+        _flush_handler_ids.append(handler_id)
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(
+                target=_flush_worker,
+                args=(interval,),
+                name="log-flush",
+                daemon=True,
+            )
+            _flush_thread.start()
+
+
 def setup_logger(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
     rotation: str = "10 MB",
     retention: str = "7 days",
+    buffering: int = FILE_BUFFER_SIZE,
+    flush_interval: float = FILE_FLUSH_INTERVAL,
+    async_file: bool = False,
+    compress: bool = False,
 ) -> None:
     """
     配置日志系统
@@ -42,7 +259,15 @@ def setup_logger(
         log_file: 日志文件路径，None则不输出到文件
         rotation: 日志轮转大小
         retention: 日志保留时间
+        buffering: 日志文件写缓冲区大小（字节），缓冲满、定时刷盘或进程退出时落盘（async_file 时同样生效）
+        flush_interval: 日志文件定时刷盘间隔（秒），0表示不定时刷盘（async_file 时不生效）
+        async_file: 是否使用aiofiles异步写日志文件（只记录事件循环运行期间的日志，
+            rotation 只支持按大小，retention 不生效；退出前需 await shutdown_logger()）
+        compress: 是否将轮转下来的日志文件gzip压缩（在后台线程中进行，不阻塞日志写入；
+            async_file 时不生效）
     """
+    global _async_sink
+
     # 控制台输出
     logger.add(
         sys.stderr,
@@ -56,14 +281,35 @@ def setup_logger(
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        logger.add(
-            log_file,
-            format=LOG_FORMAT,
-            level=log_level,
-            rotation=rotation,
-            retention=retention,
-            encoding="utf-8",
-        )
+        if async_file:
+            _async_sink = AsyncFileSink(log_path, _parse_size(rotation), buffering)
+            logger.add(_async_sink, format=LOG_FORMAT, level=log_level)
+            if compress:
+                logger.warning("异步日志文件不支持压缩轮转文件，compress 选项已忽略")
+        else:
+            # enqueue=True：格式化后的消息交给后台线程写文件，调用方（事件循环）不等待磁盘IO；
+            # buffering：写入先进缓冲区，缓冲满时才发起 write 系统调用；
+            # 另由刷盘线程每 flush_interval 秒 flush 一次，日志量小时也能及时落盘
+            handler_id = logger.add(
+                log_file,
+                format=LOG_FORMAT,
+                level=log_level,
+                rotation=rotation,
+                retention=retention,
+                encoding="utf-8",
+                enqueue=True,
+                buffering=buffering,
+                compression=_compress_in_background if compress else None,
+            )
+            if flush_interval > 0:
+                _register_periodic_flush(handler_id, flush_interval)
+
+
+async def shutdown_logger() -> None:
+    """等待所有异步日志写完并关闭日志文件（使用 async_file 时在事件循环结束前调用）"""
+    await logger.complete()
+    if _async_sink is not None:
+        await _async_sink.aclose()
 
 
 def get_logger(name: str = "CodeSummaryAgent"):
@@ -80,4 +326,4 @@ def get_logger(name: str = "CodeSummaryAgent"):
 
 
 # 导出logger供直接使用
-__all__ = ["logger", "setup_logger", "get_logger"]
+__all__ = ["logger", "setup_logger", "shutdown_logger", "get_logger"]
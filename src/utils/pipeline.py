@@ -0,0 +1,97 @@
+"""
+流水线模块
+以有界队列串联多个处理阶段，前一阶段的产出与后一阶段的网络等待相互重叠
+"""
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Iterable, List, Union
+
+# 阶段函数：接收上一阶段的产出，返回本阶段的产出（同步或异步均可）
+Stage = Callable[[Any], Union[Any, Awaitable[Any]]]
+
+# 队列结束标记
+_DONE = object()
+
+
+async def gather_or_cancel(tasks: List["asyncio.Task[Any]"]) -> List[Any]:
+    """
+    等待全部任务完成并按顺序返回结果；任一任务失败时取消其余任务并抛出该异常
+
+    asyncio.gather 在一方失败时不会取消其余任务，它们会在后台继续占用并发槽位。
+    """
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_pipeline(
+    items: Iterable[Any],
+    stages: List[Stage],
+    workers: int = 1,
+    queue_size: int = 8,
+) -> List[Any]:
+    """
+    按阶段流水线处理一组输入
+
+    每个阶段有 workers 个并发worker，阶段之间以容量为 queue_size 的队列衔接：
+    上游处理完一项就交给下游，不必等整批完成；队列满时上游暂停，避免积压。
+    任一阶段抛出异常时取消整条流水线并向上抛出。
+
+    Args:
+        items: 输入项
+        stages: 阶段函数列表，按顺序执行
+        workers: 每个阶段的并发worker数
+        queue_size: 阶段间队列容量
+
+    Returns:
+        与输入顺序一致的最后一个阶段的产出
+    """
+    items = list(items)
+    if not stages:
+        return items
+
+    results: List[Any] = [None] * len(items)
+
+    queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+
+    async def feed() -> None:
+        for index, item in enumerate(items):
+            await queues[0].put((index, item))
+        for _ in range(workers):
+            await queues[0].put(_DONE)
+
+    async def run_stage(stage_index: int) -> None:
+        stage = stages[stage_index]
+        inbox = queues[stage_index]
+        outbox = queues[stage_index + 1] if stage_index + 1 < len(stages) else None
+
+        async def worker() -> None:
+            while True:
+                entry = await inbox.get()
+                if entry is _DONE:
+                    return
+                index, value = entry
+                value = stage(value)
+                if inspect.isawaitable(value):
+                    value = await value
+                if outbox is None:
+                    results[index] = value
+                else:
+                    await outbox.put((index, value))
+
+        await gather_or_cancel([asyncio.create_task(worker()) for _ in range(workers)])
+
+        # 本阶段全部worker结束后，通知下游结束
+        if outbox is not None:
+            for _ in range(workers):
+                await outbox.put(_DONE)
+
+    await gather_or_cancel(
+        [asyncio.create_task(feed())]
+        + [asyncio.create_task(run_stage(i)) for i in range(len(stages))]
+    )
+    return results
@@ -2,9 +2,10 @@
 进度管理器模块
 使用Rich Progress提供美观的实时进度显示
 """
-import asyncio
-from typing import Optional, Dict, Set
+from typing import Optional, Dict
 from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
 from contextlib import asynccontextmanager
 import time
 
@@ -23,23 +24,91 @@ from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
-from rich.layout import Layout
 from rich.console import Group
 
-from src.models.file_node import FileNode, AnalysisStatus
+from src.models.file_node import FileNode
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 console = Console()
 
+# 并发任务表格最多显示的行数，超出部分折叠为一行计数
+MAX_VISIBLE_TASKS = 16
 
-@dataclass
+# 并发任务表格无状态变化时的最长复用时间（秒），到期后重建以刷新耗时列
+DISPLAY_MAX_AGE = 1.0
+
+
+# 并发任务表格中路径列的最大显示长度，超出时保留末尾
+MAX_DISPLAY_PATH = 48
+
+
+def _truncate_path(path: str) -> str:
+    """截断过长的路径，保留末尾部分"""
+    if len(path) > MAX_DISPLAY_PATH:
+        return "..." + path[-(MAX_DISPLAY_PATH - 3):]
+    return path
+
+
+class TaskPhase(IntEnum):
+    """任务阶段，由状态文字归类得到，用于选取状态图标"""
+    WAITING = 0
+    READING = 1
+    ANALYZING = 2
+    SAVING = 3
+    DONE = 4
+    FAILED = 5
+
+
+# 按 TaskPhase 取值索引的状态图标
+_PHASE_ICONS = (
+    "[dim]○[/dim]",
+    "[blue]📖[/blue]",
+    "[yellow]⚡[/yellow]",
+    "[cyan]💾[/cyan]",
+    "[green]✓[/green]",
+    "[red]✗[/red]",
+)
+
+
+@lru_cache(maxsize=128)
+def _status_phase(status: str) -> TaskPhase:
+    """
+    将状态文字归类为任务阶段
+
+    状态文字来自各处的进度回调，取值有限，结果按文字缓存，同一文字只做一次子串匹配
+
+    Args:
+        status: 状态文字
+
+    Returns:
+        任务阶段
+    """
+    if "分析" in status or "处理" in status:
+        return TaskPhase.ANALYZING
+    if "保存" in status:
+        return TaskPhase.SAVING
+    if "完成" in status:
+        return TaskPhase.DONE
+    if "失败" in status or "错误" in status:
+        return TaskPhase.FAILED
+    if "读取" in status:
+        return TaskPhase.READING
+    return TaskPhase.WAITING
+
+
+@dataclass(slots=True)
 class TaskInfo:
-    """并发任务信息"""
-    node: FileNode
+    """
+    并发任务信息
+
+    只保存渲染所需的扁平字段，渲染循环无需再经由 node 取属性
+    """
+    display_path: str
     status: str = "等待中"
-    start_time: float = field(default_factory=time.time)
+    status_icon: str = "[dim]○[/dim]"
+    start_time: float = field(default_factory=time.monotonic)
 
 
 class ProgressManager:
@@ -79,8 +148,8 @@ class ProgressManager:
         self.current_depth = max_depth
 
         # 并发任务追踪
+        # 状态变更方法内部没有await点，在事件循环上天然互斥，无需加锁
         self._active_tasks: Dict[str, TaskInfo] = {}
-        self._lock = asyncio.Lock()
 
         # Rich Progress 组件
         self._progress: Optional[Progress] = None
@@ -92,8 +161,18 @@ class ProgressManager:
         self._current_level_total = 0
         self._current_level_completed = 0
 
-        # 启动时间
-        self._start_time = time.time()
+        # 已同步到进度条的完成数；complete_task 只改计数，由 _flush_progress 按刷新节拍同步
+        self._flushed_completed = 0
+        self._flushed_level_completed = 0
+
+        # 启动时间（单调时钟，仅用于计算耗时，不受系统时间调整影响）
+        self._start_time = time.monotonic()
+
+        # 显示内容缓存：状态未变化时复用上次构建的Group
+        # 各状态变更方法置 _dirty，_build_display 重建后清除
+        self._dirty = True
+        self._display_built_at = 0.0
+        self._display_cache: Optional[Group] = None
 
     def _create_progress(self) -> Progress:
         """创建Progress组件"""
@@ -110,7 +189,20 @@ class ProgressManager:
         )
 
     def _build_display(self) -> Group:
-        """构建显示内容"""
+        """构建显示内容（状态未变化且缓存未过期时直接返回缓存）"""
+        self._flush_progress()
+
+        now = time.monotonic()
+        # 进度条是Group中的同一个对象，渲染时自行读取最新进度，不依赖重建；
+        # 没有并发任务时不显示耗时列，缓存在状态变化前一直有效
+        if (
+            not self._dirty
+            and self._display_cache is not None
+            and (not self._active_tasks or now - self._display_built_at < DISPLAY_MAX_AGE)
+        ):
+            return self._display_cache
+        self._dirty = False
+
         elements = []
 
         # 1. 进度条
@@ -130,18 +222,17 @@ class ProgressManager:
             table.add_column("文件", width=50, no_wrap=True, overflow="ellipsis")
             table.add_column("耗时", width=8, justify="right")
 
-            for path, task_info in list(self._active_tasks.items()):
-                elapsed = time.time() - task_info.start_time
-                status_icon = self._get_status_icon(task_info.status)
-                # 截断过长的路径
-                display_path = task_info.node.relative_path
-                if len(display_path) > 48:
-                    display_path = "..." + display_path[-45:]
+            # 本方法在Live的刷新线程中执行，事件循环线程可能同时增删任务，
+            # 直接迭代字典会因大小变化报错；list() 在GIL下一次性完成复制
+            tasks = list(self._active_tasks.values())
+            for task_info in tasks[:MAX_VISIBLE_TASKS]:
                 table.add_row(
-                    status_icon,
-                    display_path,
-                    f"{elapsed:.1f}s"
+                    task_info.status_icon,
+                    task_info.display_path,
+                    f"{now - task_info.start_time:.1f}s"
                 )
+            if len(tasks) > MAX_VISIBLE_TASKS:
+                table.add_row("", f"[dim]... 另有 {len(tasks) - MAX_VISIBLE_TASKS} 个任务[/dim]", "")
 
             elements.append(table)
 
@@ -158,22 +249,28 @@ class ProgressManager:
 
         elements.append(stats)
 
-        return Group(*elements)
+        self._display_built_at = now
+        self._display_cache = Group(*elements)
+        return self._display_cache
+
+    def _flush_progress(self) -> None:
+        """将自上次刷新以来的完成数一次性同步到进度条"""
+        if not self._progress:
+            return
+
+        completed = self.completed_files + self.completed_dirs
+        if completed != self._flushed_completed:
+            self._flushed_completed = completed
+            self._progress.update(self._overall_task_id, completed=completed)
+
+        level_completed = self._current_level_completed
+        if level_completed != self._flushed_level_completed:
+            self._flushed_level_completed = level_completed
+            self._progress.update(self._level_task_id, completed=level_completed)
 
     def _get_status_icon(self, status: str) -> str:
         """获取状态图标"""
-        if "分析" in status or "处理" in status:
-            return "[yellow]⚡[/yellow]"
-        elif "保存" in status:
-            return "[cyan]💾[/cyan]"
-        elif "完成" in status:
-            return "[green]✓[/green]"
-        elif "失败" in status or "错误" in status:
-            return "[red]✗[/red]"
-        elif "读取" in status:
-            return "[blue]📖[/blue]"
-        else:
-            return "[dim]○[/dim]"
+        return _PHASE_ICONS[_status_phase(status)]
 
     @asynccontextmanager
     async def live_progress(self):
@@ -185,7 +282,7 @@ class ProgressManager:
                 await process_files()
         """
         self._progress = self._create_progress()
-        self._start_time = time.time()
+        self._start_time = time.monotonic()
 
         # 创建总体进度任务
         self._overall_task_id = self._progress.add_task(
@@ -202,18 +299,21 @@ class ProgressManager:
             visible=False,
         )
 
-        with Live(
-            self._build_display(),
-            console=console,
-            refresh_per_second=4,
-            transient=False,
-        ) as live:
-            self._live = live
-            try:
+        # Live在自己的刷新线程中按4Hz调用 _build_display 拉取最新内容，
+        # 状态变更只修改数据，不再逐次触发重建
+        try:
+            with Live(
+                get_renderable=self._build_display,
+                console=console,
+                refresh_per_second=4,
+                transient=False,
+            ) as live:
+                self._live = live
                 yield self
-            finally:
-                self._live = None
-                self._progress = None
+        finally:
+            # Live退出时还会做最后一次渲染，需在其之后再清理
+            self._live = None
+            self._progress = None
 
     def start_level(self, depth: int, total_nodes: int) -> None:
         """
@@ -226,6 +326,7 @@ class ProgressManager:
         self.current_depth = depth
         self._current_level_total = total_nodes
         self._current_level_completed = 0
+        self._flushed_level_completed = 0
 
         if self._progress and self._level_task_id is not None:
             self._progress.update(
@@ -235,7 +336,6 @@ class ProgressManager:
                 completed=0,
                 visible=True,
             )
-            self._refresh()
 
     def complete_level(self, depth: int) -> None:
         """
@@ -249,7 +349,6 @@ class ProgressManager:
                 self._level_task_id,
                 visible=False,
             )
-            self._refresh()
 
     async def start_task(self, node: FileNode, status: str = "等待中") -> None:
         """
@@ -259,13 +358,13 @@ class ProgressManager:
             node: 文件节点
             status: 初始状态
         """
-        async with self._lock:
-            self._active_tasks[node.path] = TaskInfo(
-                node=node,
-                status=status,
-                start_time=time.time(),
-            )
-        self._refresh()
+        self._active_tasks[node.path] = TaskInfo(
+            display_path=_truncate_path(node.relative_path),
+            status=status,
+            status_icon=self._get_status_icon(status),
+            start_time=time.monotonic(),
+        )
+        self._dirty = True
 
     async def update_task(self, node: FileNode, status: str) -> None:
         """
@@ -275,10 +374,12 @@ class ProgressManager:
             node: 文件节点
             status: 新状态
         """
-        async with self._lock:
-            if node.path in self._active_tasks:
-                self._active_tasks[node.path].status = status
-        self._refresh()
+        task_info = self._active_tasks.get(node.path)
+        # 图标只在状态变化时重新计算，渲染时直接读取
+        if task_info is not None and task_info.status != status:
+            task_info.status = status
+            task_info.status_icon = self._get_status_icon(status)
+            self._dirty = True
 
     async def complete_task(self, node: FileNode, success: bool) -> None:
         """
@@ -288,39 +389,20 @@ class ProgressManager:
             node: 文件节点
             success: 是否成功
         """
-        async with self._lock:
-            # 移除活动任务
-            self._active_tasks.pop(node.path, None)
-
-            # 更新统计
-            if success:
-                if node.is_file:
-                    self.completed_files += 1
-                else:
-                    self.completed_dirs += 1
-            else:
-                self.failed_count += 1
-
-            self._current_level_completed += 1
+        # 移除活动任务
+        self._active_tasks.pop(node.path, None)
 
-        # 更新进度条
-        if self._progress:
-            completed = self.completed_files + self.completed_dirs
-            self._progress.update(
-                self._overall_task_id,
-                completed=completed,
-            )
-            self._progress.update(
-                self._level_task_id,
-                completed=self._current_level_completed,
-            )
-
-        self._refresh()
+        # 更新统计
+        if success:
+            if node.is_file:
+                self.completed_files += 1
+            else:
+                self.completed_dirs += 1
+        else:
+            self.failed_count += 1
 
-    def _refresh(self) -> None:
-        """刷新显示"""
-        if self._live:
-            self._live.update(self._build_display())
+        self._current_level_completed += 1
+        self._dirty = True
 
     def print_level_summary(
         self,
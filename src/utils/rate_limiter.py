@@ -0,0 +1,65 @@
+"""
+限流模块
+提供基于令牌桶的异步限流器
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    令牌桶限流器
+
+    以固定速率补充令牌，桶容量决定允许的突发量。
+    等待者按获取锁的先后顺序依次拿到令牌。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（最大突发量），None则等于rate
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        """
+        按每分钟配额创建令牌桶（容量等于每分钟配额）
+
+        Args:
+            limit: 每分钟允许的令牌数（如RPM）
+        """
+        return cls(rate=limit / 60.0, capacity=limit)
+
+    def _refill(self) -> None:
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        """
+        获取令牌，不足时等待补充
+
+        Args:
+            cost: 消耗的令牌数，超过桶容量时按容量计，避免永远等待
+        """
+        cost = min(cost, self.capacity)
+
+        async with self._lock:
+            self._refill()
+            while self._tokens < cost:
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= cost
@@ -32,7 +32,8 @@ class RetryHandler:
     """
     重试处理器
 
-    支持指数退避、最大重试次数、可配置的异常类型
+    支持指数退避、最大重试次数、可配置的异常类型；
+    异常带有 retry_after 属性时，该次延迟不低于其值
     """
 
     def __init__(
@@ -62,6 +63,12 @@ class RetryHandler:
         self.jitter = jitter
         self.retry_exceptions = retry_exceptions or (Exception,)
 
+        # 各次重试的基础延迟在构造时即可确定，预先算好，运行时只需叠加抖动
+        self._delays = [
+            min(base_delay * (exponential_base ** attempt), max_delay)
+            for attempt in range(max_retries + 1)
+        ]
+
     def _calculate_delay(self, attempt: int) -> float:
         """
         计算延迟时间
@@ -72,13 +79,11 @@ class RetryHandler:
         Returns:
             延迟时间（秒）
         """
-        delay = self.base_delay * (self.exponential_base ** attempt)
-        delay = min(delay, self.max_delay)
+        delay = self._delays[attempt]
 
         if self.jitter:
             # 添加 0-25% 的随机抖动
-            jitter_amount = delay * 0.25 * random.random()
-            delay += jitter_amount
+            delay += delay * 0.25 * random.random()
 
         return delay
 
@@ -102,11 +107,29 @@ class RetryHandler:
         Raises:
             RetryExhaustedError: 重试次数耗尽时抛出
         """
+        return await self._run(func, asyncio.iscoroutinefunction(func), args, kwargs)
+
+    async def _run(
+        self,
+        func: Callable[..., T],
+        is_coro: bool,
+        args: Tuple[Any, ...],
+        kwargs: dict,
+    ) -> T:
+        """
+        重试循环本体
+
+        Args:
+            func: 要执行的函数
+            is_coro: func 是否为协程函数，由调用方预先判断，循环内不再重复检查
+            args: 函数参数
+            kwargs: 函数关键字参数
+        """
         last_exception: Optional[Exception] = None
 
         for attempt in range(self.max_retries + 1):
             try:
-                if asyncio.iscoroutinefunction(func):
+                if is_coro:
                     return await func(*args, **kwargs)
                 else:
                     return func(*args, **kwargs)
@@ -117,6 +140,10 @@ class RetryHandler:
 
                 if remaining > 0:
                     delay = self._calculate_delay(attempt)
+                    # 异常携带服务端要求的等待时间（如 Retry-After）时，以其作为本次延迟的下限
+                    retry_after = getattr(e, "retry_after", None)
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
                     logger.warning(
                         f"执行失败 (尝试 {attempt + 1}/{self.max_retries + 1}): {e}. "
                         f"{delay:.2f}秒后重试..."
@@ -142,9 +169,12 @@ class RetryHandler:
             async def my_func():
                 ...
         """
+        # 被装饰函数是否为协程在装饰时即已确定，不必每次调用都判断
+        is_coro = asyncio.iscoroutinefunction(func)
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            return await self.execute(func, *args, **kwargs)
+            return await self._run(func, is_coro, args, kwargs)
         return wrapper
 
 
@@ -0,0 +1,144 @@
+"""
+Token计数工具模块
+优先使用tiktoken精确计数，未安装时按字符数保守估算
+"""
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+
+# 截断标记
+TRUNCATION_MARKER = "\n...[truncated]...\n"
+
+# 未安装tiktoken时的估算比例（中英文混合代码，偏保守）
+_CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional[Any]:
+    """
+    获取并缓存BPE编码器，未安装tiktoken时返回None
+
+    tiktoken导入较重，延迟到第一次计数时才导入，导入本模块本身不承担该开销
+    """
+    try:
+        import tiktoken
+    except ImportError:  # tiktoken为可选依赖
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """
+    统计文本的token数
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        token数（未安装tiktoken时为估算值）
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """
+    将文本截断到指定token数以内，保留头部和尾部，中间以标记替代
+
+    Args:
+        text: 文本内容
+        max_tokens: 最大token数
+
+    Returns:
+        截断后的文本，未超限时原样返回
+    """
+    encoding = _get_encoding()
+
+    if encoding is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        half = max_chars // 2
+        return text[:half] + TRUNCATION_MARKER + text[-half:]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    half = max_tokens // 2
+    return encoding.decode(tokens[:half]) + TRUNCATION_MARKER + encoding.decode(tokens[-half:])
+
+
+# 按语义边界切分时依次尝试的分隔符：Markdown二级标题 > 类定义 > 函数定义 > 换行
+SPLIT_SEPARATORS = ("\n## ", "\nclass ", "\ndef ", "\n")
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    """没有可用分隔符时按token数硬切"""
+    encoding = _get_encoding()
+
+    if encoding is None:
+        step = max_tokens * _CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def split_by_tokens(
+    text: str,
+    max_tokens: int,
+    separators: Sequence[str] = SPLIT_SEPARATORS,
+) -> List[str]:
+    """
+    按语义边界将文本切分为不超过指定token数的若干块
+
+    优先在靠前的分隔符处切分，单段仍然超限时改用下一级分隔符，
+    最后才按token数硬切。相邻的小段会合并，尽量减少块数。
+
+    Args:
+        text: 文本内容
+        max_tokens: 每块最大token数
+        separators: 分隔符，按优先级排列
+
+    Returns:
+        切分后的文本块，未超限时返回只含原文的列表
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    for level, separator in enumerate(separators):
+        if separator in text:
+            first, *rest = text.split(separator)
+            pieces = [first] + [separator + piece for piece in rest]
+            break
+    else:
+        return _hard_split(text, max_tokens)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for piece in pieces:
+        piece_tokens = count_tokens(piece)
+
+        if piece_tokens > max_tokens:
+            # 单段超限：先收尾当前块，再用更细的分隔符切分该段
+            if current:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(split_by_tokens(piece, max_tokens, separators[level + 1:]))
+            continue
+
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+
+        current.append(piece)
+        current_tokens += piece_tokens
+
+    if current:
+        chunks.append("".join(current))
+
+    return chunks
@@ -32,6 +32,35 @@ STATUS_COLORS = {
     AnalysisStatus.SKIPPED: "dim",
 }
 
+# 节点标签模板：按 (是否目录, 状态) 预先拼好名称前后的标记，渲染时只需拼接名称
+# 名称直接拼接而不经 str.format，文件名中的花括号不会被误解析
+_DIR_ICON = "[bold blue]📁[/bold blue]"
+_FILE_ICON = "📄"
+
+_STATUS_LABEL_PARTS = {
+    (True, status): (
+        f"{STATUS_ICONS[status]} {_DIR_ICON} [{STATUS_COLORS[status]}][bold]",
+        f"[/bold][/{STATUS_COLORS[status]}]",
+    )
+    for status in AnalysisStatus
+}
+_STATUS_LABEL_PARTS.update({
+    (False, status): (
+        f"{STATUS_ICONS[status]} {_FILE_ICON} [{STATUS_COLORS[status]}]",
+        f"[/{STATUS_COLORS[status]}]",
+    )
+    for status in AnalysisStatus
+})
+
+# 纯文本目录树使用的状态标记
+SIMPLE_STATUS_MARKS = {
+    AnalysisStatus.PENDING: "[ ]",
+    AnalysisStatus.IN_PROGRESS: "[~]",
+    AnalysisStatus.COMPLETED: "[+]",
+    AnalysisStatus.FAILED: "[x]",
+    AnalysisStatus.SKIPPED: "[-]",
+}
+
 
 def print_tree(
     root: FileNode,
@@ -39,6 +68,7 @@ def print_tree(
     show_files: bool = True,
     max_depth: Optional[int] = None,
     title: Optional[str] = None,
+    terminal_only: bool = False,
 ) -> None:
     """
     打印目录树结构
@@ -49,7 +79,12 @@ def print_tree(
         show_files: 是否显示文件（False则只显示目录）
         max_depth: 最大显示深度，None则显示全部
         title: 树的标题
+        terminal_only: 仅在输出到终端时打印；输出被重定向或运行于服务进程中时
+            直接返回，不遍历目录树
     """
+    if terminal_only and not console.is_terminal:
+        return
+
     tree_title = title or f"[bold blue]{root.name}[/bold blue]"
     tree = Tree(tree_title)
 
@@ -67,34 +102,39 @@ def _build_tree(
     current_depth: int,
 ) -> None:
     """
-    递归构建Rich树
+    构建Rich树
+
+    使用显式栈迭代遍历，深层目录不会触发递归深度限制
 
     Args:
         tree: Rich Tree对象
-        node: 当前节点
+        node: 起始节点
         show_status: 是否显示状态
         show_files: 是否显示文件
         max_depth: 最大深度
-        current_depth: 当前深度
+        current_depth: 起始节点的深度
     """
-    if max_depth is not None and current_depth > max_depth:
-        return
+    stack = [(tree, node, current_depth)]
 
-    for child in node.children:
-        # 如果不显示文件，跳过文件节点
-        if not show_files and child.is_file:
+    while stack:
+        parent, current, depth = stack.pop()
+        if max_depth is not None and depth > max_depth:
             continue
 
-        # 构建节点标签
-        label = _format_node_label(child, show_status)
+        for child in current.children:
+            # 如果不显示文件，跳过文件节点
+            if not show_files and child.is_file:
+                continue
+
+            # 构建节点标签
+            label = _format_node_label(child, show_status)
 
-        if child.is_dir:
-            # 目录节点，递归添加子树
-            branch = tree.add(label)
-            _build_tree(branch, child, show_status, show_files, max_depth, current_depth + 1)
-        else:
-            # 文件节点
-            tree.add(label)
+            if child.is_dir:
+                # 目录节点，入栈稍后展开子树
+                stack.append((parent.add(label), child, depth + 1))
+            else:
+                # 文件节点
+                parent.add(label)
 
 
 def _format_node_label(node: FileNode, show_status: bool) -> str:
@@ -108,19 +148,13 @@ def _format_node_label(node: FileNode, show_status: bool) -> str:
     Returns:
         格式化后的标签字符串
     """
-    if node.is_dir:
-        icon = "[bold blue]📁[/bold blue]"
-        name = f"[bold]{node.name}[/bold]"
-    else:
-        icon = "📄"
-        name = node.name
-
     if show_status:
-        status_icon = STATUS_ICONS.get(node.status, "")
-        color = STATUS_COLORS.get(node.status, "")
-        return f"{status_icon} {icon} [{color}]{name}[/{color}]"
-    else:
-        return f"{icon} {name}"
+        prefix, suffix = _STATUS_LABEL_PARTS[node.is_dir, node.status]
+        return prefix + node.name + suffix
+
+    if node.is_dir:
+        return _DIR_ICON + " [bold]" + node.name + "[/bold]"
+    return _FILE_ICON + " " + node.name
 
 
 def print_level_summary(
@@ -237,20 +271,23 @@ def create_simple_tree_str(root: FileNode, show_status: bool = True) -> str:
     Returns:
         文本格式的目录树
     """
-    lines = []
+    # 根节点
+    lines = [root.name + "/"]
+
+    # 显式栈按先序遍历：子节点逆序入栈，出栈顺序即为原顺序
+    stack = [
+        (child, "", i == len(root.children) - 1)
+        for i, child in enumerate(root.children)
+    ]
+    stack.reverse()
+
+    while stack:
+        node, prefix, is_last = stack.pop()
 
-    def build(node: FileNode, prefix: str = "", is_last: bool = True) -> None:
         # 状态标记
         status_mark = ""
         if show_status:
-            marks = {
-                AnalysisStatus.PENDING: "[ ]",
-                AnalysisStatus.IN_PROGRESS: "[~]",
-                AnalysisStatus.COMPLETED: "[+]",
-                AnalysisStatus.FAILED: "[x]",
-                AnalysisStatus.SKIPPED: "[-]",
-            }
-            status_mark = marks.get(node.status, "") + " "
+            status_mark = SIMPLE_STATUS_MARKS.get(node.status, "") + " "
 
         # 连接符
         connector = "└── " if is_last else "├── "
@@ -263,14 +300,9 @@ def create_simple_tree_str(root: FileNode, show_status: bool = True) -> str:
         # 子节点前缀
         child_prefix = prefix + ("    " if is_last else "│   ")
 
-        # 递归处理子节点
         children = node.children
-        for i, child in enumerate(children):
-            build(child, child_prefix, i == len(children) - 1)
-
-    # 根节点
-    lines.append(root.name + "/")
-    for i, child in enumerate(root.children):
-        build(child, "", i == len(root.children) - 1)
+        last_index = len(children) - 1
+        for i in range(last_index, -1, -1):
+            stack.append((children[i], child_prefix, i == last_index))
 
     return "\n".join(lines)
@@ -1,40 +1,51 @@
 """Test latest docs"""
+import argparse
 import sys
-sys.path.insert(0, 'E:/code/CodeSummaryAgent')
+from pathlib import Path
 
-from src.services.checkpoint import count_api_in_summary_doc, count_api_in_usage_doc
 
-# Latest docs
-api_doc_path = r"E:\code\NagaAgent\NagaAgent\NagaAgent_docs\API_DOC.md"
-api_usage_path = r"E:\code\NagaAgent\NagaAgent\NagaAgent_docs\API_USAGE.md"
+def main():
+    parser = argparse.ArgumentParser(description="Compare APIs in API_DOC.md and API_USAGE.md")
+    parser.add_argument("api_doc_path", help="path to API_DOC.md")
+    parser.add_argument("api_usage_path", help="path to API_USAGE.md")
+    args = parser.parse_args()
 
-with open(api_doc_path, 'r', encoding='utf-8') as f:
-    api_doc_content = f.read()
+    # 添加项目路径（只在作为脚本运行时修改 sys.path）
+    sys.path.insert(0, str(Path(__file__).parent))
 
-with open(api_usage_path, 'r', encoding='utf-8') as f:
-    api_usage_content = f.read()
+    from src.services.checkpoint import count_api_in_summary_doc, count_api_in_usage_doc
 
-summary_count, summary_apis = count_api_in_summary_doc(api_doc_content)
-usage_count, usage_apis = count_api_in_usage_doc(api_usage_content)
+    with open(args.api_doc_path, 'r', encoding='utf-8') as f:
+        api_doc_content = f.read()
 
-print(f"API_DOC.md: {summary_count}")
-print(f"API_USAGE.md: {usage_count}")
+    with open(args.api_usage_path, 'r', encoding='utf-8') as f:
+        api_usage_content = f.read()
 
-summary_set = {api.upper() for api in summary_apis}
-usage_set = {api.upper() for api in usage_apis}
+    summary_count, summary_apis = count_api_in_summary_doc(api_doc_content)
+    usage_count, usage_apis = count_api_in_usage_doc(api_usage_content)
 
-only_in_summary = summary_set - usage_set
-only_in_usage = usage_set - summary_set
+    print(f"API_DOC.md: {summary_count}")
+    print(f"API_USAGE.md: {usage_count}")
 
-print(f"\nonly_in_summary: {len(only_in_summary)}")
-print(f"only_in_usage: {len(only_in_usage)}")
+    summary_set = {api.upper() for api in summary_apis}
+    usage_set = {api.upper() for api in usage_apis}
 
-if only_in_summary:
-    print(f"\nOnly in API_DOC.md:")
-    for api in sorted(only_in_summary):
-        print(f"  - {api}")
+    only_in_summary = summary_set - usage_set
+    only_in_usage = usage_set - summary_set
 
-if only_in_usage:
-    print(f"\nOnly in API_USAGE.md:")
-    for api in sorted(only_in_usage):
-        print(f"  - {api}")
+    print(f"\nonly_in_summary: {len(only_in_summary)}")
+    print(f"only_in_usage: {len(only_in_usage)}")
+
+    if only_in_summary:
+        print(f"\nOnly in API_DOC.md:")
+        for api in sorted(only_in_summary):
+            print(f"  - {api}")
+
+    if only_in_usage:
+        print(f"\nOnly in API_USAGE.md:")
+        for api in sorted(only_in_usage):
+            print(f"  - {api}")
+
+
+if __name__ == "__main__":
+    main()